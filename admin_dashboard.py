@@ -1,11 +1,17 @@
+# pandas and plotly are imported inside the methods that use them: together they take
+# longer to import than the rest of the app, and most sessions never open the dashboard
 import streamlit as st
-import sqlite3
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import json
 from datetime import datetime, timedelta
 import os
+from utils.kb_index import get_kb_index
+from utils.db import get_connection
+from utils.dashboard_data import get_dashboard_cache, get_user_page, get_feedback_page
+from utils.message_meta import PATHS
+from utils.metrics import get_metrics, metrics_report
+
+PAGE_SIZE = 50
+LATENCY_WINDOW = 5000   # most recent bot replies behind the latency percentiles
 
 # ==========================================================
 # Database Operations for Admin
@@ -16,7 +22,8 @@ class AdminDatabase:
         self.kb_path = "data/knowledge_base.json"
         
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        # Pooled per-thread connection, shared with the rest of the app; don't close it
+        return get_connection(self.db_path)
     
     def load_knowledge_base(self):
         """Load knowledge base from JSON file"""
@@ -29,51 +36,80 @@ class AdminDatabase:
     def save_knowledge_base(self, knowledge_base):
         """Save knowledge base to JSON file"""
         os.makedirs("data", exist_ok=True)
-        with open(self.kb_path, "w", encoding="utf-8") as f:
+        # Write to a temp file and swap it in so the chat never reads a half-written file
+        tmp_path = self.kb_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(knowledge_base, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.kb_path)
+
+        # Rebuild the shared knowledge base index on the next lookup
+        get_kb_index().invalidate()
     
     def get_usage_statistics(self):
-        """Get comprehensive usage statistics"""
+        """Get comprehensive usage statistics (read from the rollup tables, O(days) rows)"""
+        import pandas as pd
+
         conn = self.get_connection()
         
         daily_queries = pd.read_sql_query("""
-            SELECT DATE(timestamp) as date, COUNT(*) as count 
-            FROM messages 
-            WHERE sender = 'user'
-            GROUP BY DATE(timestamp) 
+            SELECT date, count
+            FROM daily_query_counts
             ORDER BY date
         """, conn)
         
         top_topics = pd.read_sql_query("""
-            SELECT m.message_content as query, COUNT(*) as frequency
-            FROM messages m
-            WHERE m.sender = 'user'
-            GROUP BY m.message_content
+            SELECT normalized_query as query, frequency
+            FROM query_frequency
             ORDER BY frequency DESC
             LIMIT 10
         """, conn)
         
         demographics = pd.read_sql_query("""
-            SELECT age_group, language, COUNT(*) as count
-            FROM users
-            GROUP BY age_group, language
+            SELECT age_group, language, count
+            FROM demographics_counts
         """, conn)
         
         feedback_stats = pd.read_sql_query("""
-            SELECT rating, COUNT(*) as count,
-                   COUNT(CASE WHEN comment != '' THEN 1 END) as with_comments
-            FROM feedback
-            GROUP BY rating
+            SELECT rating, count, with_comments
+            FROM feedback_rating_counts
         """, conn)
         
-        conn.close()
+        topic_popularity = pd.read_sql_query("""
+            SELECT t.name as topic, c.count
+            FROM topic_counts c
+            JOIN kb_topics t ON t.id = c.topic_id
+            ORDER BY c.count DESC
+            LIMIT 10
+        """, conn)
+        
+        recent_latency = pd.read_sql_query("""
+            SELECT path, latency_ms
+            FROM message_meta
+            WHERE latency_ms IS NOT NULL
+            ORDER BY message_id DESC
+            LIMIT ?
+        """, conn, params=(LATENCY_WINDOW,))
         
         return {
             'daily_queries': daily_queries,
             'top_topics': top_topics,
             'demographics': demographics,
-            'feedback_stats': feedback_stats
+            'feedback_stats': feedback_stats,
+            'topic_popularity': topic_popularity,
+            'latency_percentiles': self.latency_percentiles(recent_latency)
         }
+    
+    def latency_percentiles(self, recent_latency):
+        """p50/p95/p99 reply latency (ms) per response path"""
+        import pandas as pd
+
+        if recent_latency.empty:
+            return pd.DataFrame(columns=['path', 'percentile', 'latency_ms'])
+        recent_latency['path'] = recent_latency['path'].map(lambda code: PATHS[code])
+        percentiles = recent_latency.groupby('path')['latency_ms'].quantile([0.5, 0.95, 0.99]).reset_index()
+        percentiles.columns = ['path', 'percentile', 'latency_ms']
+        percentiles['percentile'] = percentiles['percentile'].map({0.5: 'p50', 0.95: 'p95', 0.99: 'p99'})
+        return percentiles
 
 # ==========================================================
 # Enhanced Admin Dashboard
@@ -81,15 +117,44 @@ class AdminDatabase:
 class EnhancedAdminDashboard:
     def __init__(self):
         self.db = AdminDatabase()
+        self.cache = get_dashboard_cache()
+    
+    def usage_statistics(self):
+        """Usage statistics shared by all admin sessions, kept warm by the background refresher"""
+        return self.cache.get("usage_statistics", self.db.get_usage_statistics, refresh=True)
+    
+    def page_cursor(self, key, filters):
+        """Keyset cursor of the page being shown; going back to page 1 when the filters change"""
+        if st.session_state.get(f"{key}_filters") != filters:
+            st.session_state[f"{key}_filters"] = filters
+            st.session_state[f"{key}_cursors"] = [None]
+        return st.session_state[f"{key}_cursors"][-1]
+    
+    def page_controls(self, key, next_cursor):
+        """Previous/Next buttons over the cursors of the pages visited so far"""
+        cursors = st.session_state[f"{key}_cursors"]
+        col1, col2, col3 = st.columns([1, 1, 4])
+        with col1:
+            if st.button("⬅️ Previous", key=f"{key}_previous", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if st.button("Next ➡️", key=f"{key}_next", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+        with col3:
+            st.caption(f"Page {len(cursors)}")
     
     def show_dashboard_overview(self):
+        import plotly.express as px
+
         st.header("📊 Dashboard Overview")
         
-        stats = self.db.get_usage_statistics()
+        stats = self.usage_statistics()
         
         col1, col2, col3, col4 = st.columns(4)
         
-        total_users = len(stats['demographics'])
+        total_users = stats['demographics']['count'].sum() if not stats['demographics'].empty else 0
         total_queries = stats['daily_queries']['count'].sum() if not stats['daily_queries'].empty else 0
         total_feedback = stats['feedback_stats']['count'].sum() if not stats['feedback_stats'].empty else 0
         positive_feedback = stats['feedback_stats'][
@@ -101,7 +166,7 @@ class EnhancedAdminDashboard:
         with col2:
             st.metric("Total Queries", total_queries)
         with col3:
-            st.metric("Health Topics", len(self.db.load_knowledge_base()))
+            st.metric("Health Topics", len(get_kb_index().topics))
         with col4:
             st.metric("Positive Feedback", f"{positive_feedback}/{total_feedback}")
         
@@ -132,17 +197,48 @@ class EnhancedAdminDashboard:
                 st.info("No feedback data available")
         
         st.subheader("🔝 Top Health Topics Queried")
-        if not stats['top_topics'].empty:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if not stats['topic_popularity'].empty:
+                fig = px.bar(
+                    stats['topic_popularity'].head(5),
+                    x='count',
+                    y='topic',
+                    orientation='h',
+                    title="Top 5 Knowledge Base Topics in Replies"
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("No topic data available yet.")
+        
+        with col2:
+            if not stats['top_topics'].empty:
+                fig = px.bar(
+                    stats['top_topics'].head(5),
+                    x='frequency',
+                    y='query',
+                    orientation='h',
+                    title="Top 5 Queries"
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("No query data available for top topics.")
+        
+        st.subheader("⏱️ Reply Latency")
+        if not stats['latency_percentiles'].empty:
             fig = px.bar(
-                stats['top_topics'].head(5),
-                x='frequency',
-                y='query',
-                orientation='h',
-                title="Top 5 Queried Topics"
+                stats['latency_percentiles'],
+                x='path',
+                y='latency_ms',
+                color='percentile',
+                barmode='group',
+                title=f"Reply latency percentiles by path (last {LATENCY_WINDOW} replies)",
+                labels={'latency_ms': 'Latency (ms)', 'path': 'Response path'}
             )
             st.plotly_chart(fig, use_container_width=True)
         else:
-            st.info("No query data available for top topics.")
+            st.info("No latency data available yet.")
     
     def manage_knowledge_base(self):
         st.header("📚 Knowledge Base Management")
@@ -248,96 +344,94 @@ class EnhancedAdminDashboard:
             st.info("ℹ️ No health topics found in the knowledge base. Add your first topic above!")
     
     def user_management(self):
+        import pandas as pd
+        import plotly.express as px
+
         st.header("👥 User Management")
         
-        conn = self.db.get_connection()
-        
-        # Get users data
-        users_query = """
-            SELECT id, email, name, language, age_group, created_at
-            FROM users 
-            ORDER BY created_at DESC
-        """
-        users_df = pd.read_sql_query(users_query, conn)
+        demographics = self.usage_statistics()['demographics']
         
-        conn.close()
-        
-        if not users_df.empty:
-            # Display users table
+        if not demographics.empty:
+            # Display users table, one page at a time, filtered in SQL
             st.subheader("📊 Registered Users")
-            st.dataframe(users_df, use_container_width=True)
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                search = st.text_input("🔍 Search by email or name", key="user_search")
+            with col2:
+                languages = sorted(lang for lang in demographics['language'].unique() if lang)
+                language = st.selectbox("Language", ["All"] + languages, key="user_language")
+            language = None if language == "All" else language
+            
+            filters = (search.strip(), language)
+            before_id = self.page_cursor("users", filters)
+            rows, next_cursor = self.cache.get(
+                ("users", filters, before_id),
+                lambda: get_user_page(search.strip(), language, before_id, PAGE_SIZE)
+            )
+            if rows:
+                st.dataframe(pd.DataFrame(rows), use_container_width=True)
+            else:
+                st.info("No users match these filters.")
+            self.page_controls("users", next_cursor)
             
             # Display charts
             col1, col2 = st.columns(2)
             
             with col1:
-                if not users_df.empty and 'age_group' in users_df.columns:
-                    age_chart = users_df['age_group'].value_counts()
-                    if not age_chart.empty:
-                        fig = px.pie(
-                            values=age_chart.values, 
-                            names=age_chart.index,
-                            title="👥 Age Group Distribution"
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.info("No age group data available")
+                age_chart = demographics.groupby('age_group')['count'].sum().sort_values(ascending=False)
+                if not age_chart.empty:
+                    fig = px.pie(
+                        values=age_chart.values, 
+                        names=age_chart.index,
+                        title="👥 Age Group Distribution"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.info("No age group data available")
             
             with col2:
-                if not users_df.empty and 'language' in users_df.columns:
-                    lang_chart = users_df['language'].value_counts()
-                    if not lang_chart.empty:
-                        fig = px.bar(
-                            x=lang_chart.values, 
-                            y=lang_chart.index,
-                            orientation='h',
-                            title="🌐 Language Preferences",
-                            labels={'x': 'Number of Users', 'y': 'Language'}
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.info("No language data available")
+                lang_chart = demographics.groupby('language')['count'].sum().sort_values(ascending=False)
+                if not lang_chart.empty:
+                    fig = px.bar(
+                        x=lang_chart.values, 
+                        y=lang_chart.index,
+                        orientation='h',
+                        title="🌐 Language Preferences",
+                        labels={'x': 'Number of Users', 'y': 'Language'}
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.info("No language data available")
             
             # User statistics
             st.subheader("📈 User Statistics")
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                st.metric("Total Users", len(users_df))
+                st.metric("Total Users", demographics['count'].sum())
             with col2:
-                most_common_lang = users_df['language'].mode()[0] if not users_df['language'].mode().empty else "N/A"
-                st.metric("Most Common Language", most_common_lang)
+                st.metric("Most Common Language", lang_chart.index[0] if not lang_chart.empty else "N/A")
             with col3:
-                most_common_age = users_df['age_group'].mode()[0] if not users_df['age_group'].mode().empty else "N/A"
-                st.metric("Most Common Age Group", most_common_age)
+                st.metric("Most Common Age Group", age_chart.index[0] if not age_chart.empty else "N/A")
                 
         else:
             st.info("ℹ️ No users found in the database.")
     
     def feedback_analysis(self):
+        import pandas as pd
+        import plotly.express as px
+
         st.header("⭐ Feedback Analysis")
         
-        conn = self.db.get_connection()
+        feedback_stats = self.usage_statistics()['feedback_stats']
         
-        # Get feedback data
-        feedback_query = """
-            SELECT f.rating, f.comment, f.timestamp, u.email, f.query, f.bot_response
-            FROM feedback f
-            JOIN users u ON f.user_id = u.id
-            ORDER BY f.timestamp DESC
-        """
-        feedback_df = pd.read_sql_query(feedback_query, conn)
-        
-        conn.close()
-        
-        if not feedback_df.empty:
+        if not feedback_stats.empty:
             # Metrics
             col1, col2, col3 = st.columns(3)
             
-            total_feedback = len(feedback_df)
-            positive = len(feedback_df[feedback_df['rating'] == 'up'])
-            negative = len(feedback_df[feedback_df['rating'] == 'down'])
-            with_comments = len(feedback_df[feedback_df['comment'].notna() & (feedback_df['comment'] != '')])
+            total_feedback = feedback_stats['count'].sum()
+            positive = feedback_stats[feedback_stats['rating'] == 'up']['count'].sum()
+            with_comments = feedback_stats['with_comments'].sum()
             
             with col1:
                 st.metric("Total Feedback", total_feedback)
@@ -346,16 +440,17 @@ class EnhancedAdminDashboard:
             with col3:
                 st.metric("With Comments", with_comments)
             
-            # Negative feedback with comments
+            # Negative feedback with comments, one page at a time
             st.subheader("📌 Negative Feedback With Comments")
             
-            negative_with_comments = feedback_df[
-                (feedback_df["rating"] == "down") & 
-                (feedback_df["comment"].notna()) & 
-                (feedback_df["comment"].str.strip() != "")
-            ]
+            before_id = self.page_cursor("feedback", ("down", True))
+            rows, next_cursor = self.cache.get(
+                ("negative_feedback", before_id),
+                lambda: get_feedback_page("down", True, before_id, PAGE_SIZE)
+            )
             
-            if not negative_with_comments.empty:
+            if rows:
+                negative_with_comments = pd.DataFrame(rows)
                 # Display simplified table
                 display_df = negative_with_comments[['rating', 'comment', 'timestamp']].copy()
                 display_df['timestamp'] = pd.to_datetime(display_df['timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
@@ -369,23 +464,77 @@ class EnhancedAdminDashboard:
                         st.write(f"**User Query:** {row['query']}")
                         st.write(f"**Bot Response:** {row['bot_response']}")
                         st.write(f"**User Comment:** {row['comment']}")
+                self.page_controls("feedback", next_cursor)
             else:
                 st.success("🎉 No negative feedback with comments! Great job!")
             
             # Feedback distribution chart
             st.subheader("📊 Feedback Distribution")
-            if not feedback_df.empty:
-                rating_counts = feedback_df['rating'].value_counts()
-                fig = px.pie(
-                    values=rating_counts.values,
-                    names=rating_counts.index,
-                    title="Feedback Rating Distribution"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+            fig = px.pie(
+                feedback_stats,
+                values='count',
+                names='rating',
+                title="Feedback Rating Distribution"
+            )
+            st.plotly_chart(fig, use_container_width=True)
                 
         else:
             st.info("ℹ️ No feedback available in the database.")
 
+    def performance(self):
+        import pandas as pd
+        import plotly.express as px
+
+        st.header("⏱️ Performance")
+        st.caption("Live numbers for this server process since it started (percentiles over the most recent samples).")
+        
+        report = metrics_report()
+        caches = report['caches']
+        
+        # Cache hit rates
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Response Cache Hit Rate", f"{caches['response_cache']['hit_rate']:.0%}")
+        with col2:
+            st.metric("Translation Cache Hit Rate", f"{caches['translation_cache']['hit_rate']:.0%}")
+        with col3:
+            st.metric("Chat Turns", report['counters'].get('chat.turns', 0))
+        with col4:
+            st.metric("DB Write Errors", report['counters'].get('db.write_errors', 0))
+        
+        # Latency histograms
+        st.subheader("📈 Latency by Stage (ms)")
+        if report['timers']:
+            timers_df = pd.DataFrame.from_dict(report['timers'], orient='index')
+            timers_df.index.name = 'stage'
+            st.dataframe(timers_df, use_container_width=True)
+            
+            chat_stages = timers_df[timers_df.index.str.startswith('chat.')].reset_index()
+            fig = px.bar(
+                chat_stages.melt(id_vars='stage', value_vars=['p50_ms', 'p95_ms', 'p99_ms'],
+                                 var_name='percentile', value_name='ms'),
+                x='stage',
+                y='ms',
+                color='percentile',
+                barmode='group',
+                title="Chat turn stages"
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No requests measured yet.")
+        
+        # Counters and component stats
+        st.subheader("🔢 Counters")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.json(report['counters'])
+        with col2:
+            st.json(caches)
+        
+        if st.button("♻️ Reset Measurements", key="metrics_reset"):
+            get_metrics().reset()
+            st.rerun()
+    
     def run(self):
         # Create sidebar FIRST - this is critical
         with st.sidebar:
@@ -396,12 +545,17 @@ class EnhancedAdminDashboard:
                 st.session_state.admin_authenticated = False
                 st.rerun()
             
+            # Dashboard data is cached for all admins; reload it now instead of waiting for the refresh
+            if st.button("🔄 Refresh Data", use_container_width=True, key="admin_refresh"):
+                self.cache.invalidate()
+                st.rerun()
+            
             st.markdown("---")
             
             # Navigation
             page = st.radio(
                 "Navigation",
-                ["📊 Dashboard", "📚 Knowledge Base", "👥 User Management", "⭐ Feedback Analysis"],
+                ["📊 Dashboard", "📚 Knowledge Base", "👥 User Management", "⭐ Feedback Analysis", "⏱️ Performance"],
                 key="admin_navigation"
             )
         
@@ -413,4 +567,6 @@ class EnhancedAdminDashboard:
         elif page == "👥 User Management":
             self.user_management()
         elif page == "⭐ Feedback Analysis":
-            self.feedback_analysis()
\ No newline at end of file
+            self.feedback_analysis()
+        elif page == "⏱️ Performance":
+            self.performance()
\ No newline at end of file
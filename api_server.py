@@ -0,0 +1,188 @@
+"""
+Headless HTTP API for the wellness chatbot.
+
+Exposes the same functions the Streamlit app uses (login, chat turn,
+feedback, history), so mobile clients and load tests don't need a browser.
+/chat/stream sends the reply as newline-delimited JSON, one line per
+section, so clients can render it before the whole reply is ready.
+Requests carry the access token from /login as a Bearer token; it lasts an
+hour, and /refresh trades the refresh token for a new pair.
+Every worker process keeps its own knowledge base index, response cache and
+NLU client; the translation cache's disk tier and the database are shared.
+
+Run with (WELLBOT_SECRET_KEY signs the tokens; the server refuses to start without it):
+    WELLBOT_SECRET_KEY=... uvicorn api_server:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import json
+
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from utils.auth import (check_secret_key, init_db, register_user, authenticate, create_token, get_user_profile, verify_token,
+                        create_refresh_token, refresh_session, revoke_refresh_token)
+from utils.chat_pipeline import run_chat_turn, stream_chat_turn
+from utils.db_ops import start_conversation, store_feedback, conversation_belongs_to, get_message_history
+from utils.metrics import configure_logging, metrics_report
+from utils.nlu_client import get_nlu_client
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Worker startup: signing key check, logging, database schema and the NLU client"""
+    check_secret_key()
+    configure_logging()
+    init_db()
+    get_nlu_client()
+    yield
+
+
+app = FastAPI(title="Digital Wellness Chatbot API", lifespan=lifespan)
+
+
+class RegisterRequest(BaseModel):
+    email: str
+    password: str
+    name: str
+    language: str = "English"
+    age_group: str = ""
+
+
+class LoginRequest(BaseModel):
+    email: str
+    password: str
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class ChatRequest(BaseModel):
+    message: str
+    conversation_id: Optional[int] = None
+
+
+class FeedbackRequest(BaseModel):
+    query: str
+    bot_response: str
+    rating: str
+    comment: str = ""
+
+
+def current_user(authorization: Optional[str] = Header(None)):
+    """Resolve the Bearer token issued by /login or /refresh to the user's id and language (no DB access once verified)"""
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Missing Authorization header")
+    claims = verify_token(authorization.removeprefix("Bearer ").strip())
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return {"id": claims["user_id"], "email": claims["email"], "language": claims.get("language") or "English"}
+
+
+def login_response(profile, token):
+    return {
+        "token": token,
+        "refresh_token": create_refresh_token(profile["id"]),
+        "user_id": profile["id"],
+        "language": profile["language"],
+        "conversation_id": start_conversation(profile["id"]),
+    }
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@app.get("/metrics")
+def metrics():
+    """Latency histograms (p50/p95/p99), counters and cache hit rates of this worker process"""
+    return metrics_report()
+
+
+@app.post("/register")
+def register(body: RegisterRequest):
+    if not register_user(body.email, body.password, body.name, body.language, body.age_group):
+        raise HTTPException(status_code=409, detail="Email already exists")
+    return login_response(get_user_profile(body.email), create_token(body.email))
+
+
+@app.post("/login")
+def login(body: LoginRequest):
+    profile = authenticate(body.email, body.password)
+    if not profile:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return login_response(profile, profile["token"])
+
+
+@app.post("/refresh")
+def refresh(body: RefreshRequest):
+    """New access token and refresh token; the refresh token sent is used up"""
+    session = refresh_session(body.refresh_token)
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+    return session
+
+
+@app.post("/logout")
+def logout(body: RefreshRequest):
+    revoke_refresh_token(body.refresh_token)
+    return {"status": "ok"}
+
+
+def chat_conversation(body, user):
+    """Validate a chat request and return the conversation it belongs to"""
+    if not body.message.strip():
+        raise HTTPException(status_code=400, detail="Empty message")
+    if body.conversation_id is None:
+        return start_conversation(user["id"])
+    if not conversation_belongs_to(body.conversation_id, user["id"]):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return body.conversation_id
+
+
+@app.post("/chat")
+def chat(body: ChatRequest, user=Depends(current_user)):
+    conversation_id = chat_conversation(body, user)
+    metadata = {}
+    response, timings = run_chat_turn(conversation_id, body.message, user["language"], metadata)
+    return {
+        "conversation_id": conversation_id,
+        "response": response,
+        "path": metadata.get("path"),
+        "topics": metadata.get("topics", []),
+        "timings": timings,
+    }
+
+
+@app.post("/chat/stream")
+def chat_stream(body: ChatRequest, user=Depends(current_user)):
+    conversation_id = chat_conversation(body, user)
+
+    def lines():
+        timings = {}
+        for section in stream_chat_turn(conversation_id, body.message, user["language"], timings):
+            yield json.dumps({"section": section}, ensure_ascii=False) + "\n"
+        yield json.dumps({"done": True, "conversation_id": conversation_id, "timings": timings}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/feedback")
+def feedback(body: FeedbackRequest, user=Depends(current_user)):
+    if body.rating not in ("up", "down"):
+        raise HTTPException(status_code=400, detail="rating must be 'up' or 'down'")
+    store_feedback(user["id"], body.query, body.bot_response, body.rating, body.comment)
+    return {"status": "ok"}
+
+
+@app.get("/history/{conversation_id}")
+def history(conversation_id: int, before_id: Optional[int] = None, limit: int = 20, user=Depends(current_user)):
+    """Newest page of messages; pass the returned next_before_id to get the page before it"""
+    if not conversation_belongs_to(conversation_id, user["id"]):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    messages, cursor = get_message_history(conversation_id, before_id, max(1, min(limit, 200)))
+    return {"conversation_id": conversation_id, "messages": messages, "next_before_id": cursor}
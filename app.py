@@ -1,29 +1,62 @@
 import streamlit as st
-from utils.auth import init_db, register_user, login_user, get_user_language, get_user_id
-from utils.response_generator import get_response
-from utils.db_ops import start_conversation, log_message, store_feedback
-from deep_translator import GoogleTranslator
-
-# Initialize database
-init_db()
-
-# Initialize translator
-translator = GoogleTranslator(source='auto', target='hi')
+from utils.auth import (check_secret_key, init_db, register_user, authenticate, create_token, get_user_profile, verify_token,
+                        create_refresh_token, refresh_session, revoke_refresh_token)
+from utils.chat_pipeline import stream_chat_turn
+from utils.db_ops import start_conversation, store_feedback, get_message_history
+from utils.kb_index import get_kb_index
+from utils.metrics import configure_logging
+from utils.nlu_client import get_nlu_client
+from utils.translation_cache import translate
+
+# Streamlit re-executes this script on every interaction; anything that only needs to happen
+# once per server process goes through st.cache_resource
+@st.cache_resource
+def init_resources():
+    """
+    Process-wide startup, shared by every session and rerun:
+    - log level from WELLBOT_LOG_LEVEL (DEBUG shows per-turn timings)
+    - database schema and migrations
+    - the shared NLU client (loads the Rasa model once when WELLBOT_NLU_MODE=inprocess)
+    - the knowledge base index
+    The translator backend is created on the first translation that misses the cache.
+    """
+    configure_logging()
+    init_db()
+    get_nlu_client()
+    get_kb_index()
+    return True
+
+# Without a signing key, refuse to run rather than issue forgeable tokens
+try:
+    check_secret_key()
+except RuntimeError as e:
+    st.error(str(e))
+    st.stop()
+
+init_resources()
 
 def translate_text(text, target_lang):
     """Unified translation function"""
     if target_lang == "Hindi" and text.strip():
         try:
-            translated = translator.translate(text)
+            translated = translate(text, 'hi')
             return translated
         except Exception as e:
             print(f"Translation error: {e}")
             return text
     return text
 
+# Chat view keeps and renders only the latest messages; older ones are paged in from the database
+CHAT_WINDOW = 20
+HISTORY_PAGE_SIZE = 20
+
 # Initialize session state
 if 'current_language' not in st.session_state: st.session_state.current_language = "English"
 if 'messages' not in st.session_state: st.session_state.messages = []
+if 'older_messages' not in st.session_state: st.session_state.older_messages = []
+if 'has_older_messages' not in st.session_state: st.session_state.has_older_messages = False
+if 'history_loaded' not in st.session_state: st.session_state.history_loaded = False
+if 'history_cursor' not in st.session_state: st.session_state.history_cursor = None
 if 'show_chat' not in st.session_state: st.session_state.show_chat = False
 if 'show_auth' not in st.session_state: st.session_state.show_auth = False
 if 'user_language_set' not in st.session_state: st.session_state.user_language_set = False
@@ -35,6 +68,69 @@ if 'user_id' not in st.session_state: st.session_state.user_id = None
 if 'conversation_id' not in st.session_state: st.session_state.conversation_id = None
 if 'email' not in st.session_state: st.session_state.email = None
 
+# ---------- CHAT HISTORY ----------
+def reset_chat_history():
+    st.session_state.messages = []
+    st.session_state.older_messages = []
+    st.session_state.has_older_messages = False
+    st.session_state.history_loaded = False
+    st.session_state.history_cursor = None
+
+def trim_chat_window():
+    """Keep only the latest CHAT_WINDOW messages in the session"""
+    overflow = len(st.session_state.messages) - CHAT_WINDOW
+    if overflow > 0:
+        trimmed = st.session_state.messages[:overflow]
+        st.session_state.messages = st.session_state.messages[overflow:]
+        if st.session_state.history_loaded:
+            st.session_state.older_messages.extend(trimmed)
+        else:
+            st.session_state.has_older_messages = True
+
+def load_older_messages():
+    """Prepend the previous page of this conversation from the database"""
+    conversation_id = st.session_state.conversation_id
+    if not st.session_state.history_loaded:
+        # First page: the newest rows include the messages still held in the session, so drop those
+        in_session = len(st.session_state.messages)
+        page, cursor = get_message_history(conversation_id, None, HISTORY_PAGE_SIZE + in_session)
+        page = page[:max(0, len(page) - in_session)]
+        st.session_state.history_loaded = True
+    else:
+        page, cursor = get_message_history(conversation_id, st.session_state.history_cursor, HISTORY_PAGE_SIZE)
+
+    older = [{"role": "user" if m["sender"] == "user" else "assistant", "content": m["content"]} for m in page]
+    st.session_state.older_messages = older + st.session_state.older_messages
+    st.session_state.history_cursor = cursor
+    st.session_state.has_older_messages = cursor is not None
+
+# ---------- SESSION ----------
+def end_session():
+    """Log out: revoke the refresh token and clear the user's session state"""
+    revoke_refresh_token(st.session_state.get("refresh_token"))
+    for key in list(st.session_state.keys()):
+        if key not in ['current_language', 'show_chat', 'show_auth', 'user_language_set', 'show_admin', 'admin_authenticated']:
+            del st.session_state[key]
+    st.session_state.show_chat = False
+    st.session_state.show_auth = False
+
+def check_session():
+    """
+    Keep the stored access token valid on every rerun:
+    - verify_token answers from the in-memory claims cache, without a database query
+    - an expired token is swapped for a new pair with the refresh token
+    - if that fails too, the user is logged out
+    """
+    if "token" not in st.session_state or verify_token(st.session_state["token"]):
+        return
+    session = refresh_session(st.session_state.get("refresh_token"))
+    if session:
+        st.session_state["token"] = session["token"]
+        st.session_state["refresh_token"] = session["refresh_token"]
+    else:
+        end_session()
+        st.warning("⚠️ Your session has expired. Please log in again.")
+
 # ---------- NAVIGATION ----------
 def go_to_welcome():
     st.session_state.show_chat = False
@@ -57,6 +153,12 @@ def go_to_admin():
     st.rerun()
 
 # ---------- SIMPLE ADMIN PANEL THAT WORKS ----------
+@st.cache_resource
+def get_admin_dashboard():
+    # Imported on first use: admin_dashboard pulls in pandas and plotly
+    from admin_dashboard import EnhancedAdminDashboard
+    return EnhancedAdminDashboard()
+
 def show_admin_panel():
     """Simple admin panel that integrates properly"""
     
@@ -85,11 +187,8 @@ def show_admin_panel():
     
     # If authenticated, show the actual admin interface
     try:
-        # Import the dashboard class
-        from admin_dashboard import EnhancedAdminDashboard
-        
-        # Create dashboard instance
-        dashboard = EnhancedAdminDashboard()
+        # One dashboard instance for the process (it keeps no per-session state)
+        dashboard = get_admin_dashboard()
         
         # MANUALLY CREATE THE SIDEBAR
         with st.sidebar:
@@ -99,10 +198,15 @@ def show_admin_panel():
                 st.session_state.admin_authenticated = False
                 st.rerun()
             
+            # Dashboard data is cached for all admins; reload it now instead of waiting for the refresh
+            if st.button("🔄 Refresh Data", use_container_width=True, key="admin_refresh_btn"):
+                dashboard.cache.invalidate()
+                st.rerun()
+            
             st.markdown("---")
             
             # Navigation
-            nav_options = ["📊 Dashboard", "📚 Knowledge Base", "👥 User Management", "⭐ Feedback Analysis"]
+            nav_options = ["📊 Dashboard", "📚 Knowledge Base", "👥 User Management", "⭐ Feedback Analysis", "⏱️ Performance"]
             selected_nav = st.radio("Navigation", nav_options, key="admin_nav_radio")
         
         # Show the selected page based on navigation
@@ -114,6 +218,8 @@ def show_admin_panel():
             dashboard.user_management()
         elif selected_nav == "⭐ Feedback Analysis":
             dashboard.feedback_analysis()
+        elif selected_nav == "⏱️ Performance":
+            dashboard.performance()
             
     except Exception as e:
         st.error(f"Error loading admin dashboard: {e}")
@@ -163,6 +269,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---------- APP ROUTING ----------
+check_session()
 
 # WELCOME SCREEN
 if not st.session_state.show_auth and not st.session_state.show_chat and not st.session_state.show_admin:
@@ -207,15 +314,17 @@ elif st.session_state.show_auth and "token" not in st.session_state:
 
         if st.button("🔑 Login to Chat", use_container_width=True, key="login_submit_btn"):
             if email_login and password_login:
-                token = login_user(email_login, password_login)
-                if token:
-                    st.session_state["token"] = token
+                # One query for the user row; bcrypt runs in the worker process pool
+                profile = authenticate(email_login, password_login)
+                if profile:
+                    st.session_state["token"] = profile["token"]
+                    st.session_state["refresh_token"] = create_refresh_token(profile["id"])
                     st.session_state["email"] = email_login
                     st.session_state.show_chat = True
                     st.session_state.show_auth = False
-                    st.session_state.messages = []
+                    reset_chat_history()
 
-                    user_id = get_user_id(email_login)
+                    user_id = profile["id"]
                     st.session_state.user_id = user_id
 
                     try:
@@ -224,7 +333,7 @@ elif st.session_state.show_auth and "token" not in st.session_state:
                         st.error(f"Error starting conversation: {e}")
                         st.session_state.conversation_id = None
 
-                    st.session_state.current_language = get_user_language(email_login)
+                    st.session_state.current_language = profile["language"] or "English"
                     st.session_state.user_language_set = True
 
                     st.success("🎉 Welcome! Redirecting...")
@@ -250,19 +359,22 @@ elif st.session_state.show_auth and "token" not in st.session_state:
         if st.button("🚀 Create Account & Continue", use_container_width=True, key="reg_submit_btn"):
             if name and email and password:
                 if register_user(email, password, name, selected_language, age_group):
-                    token = login_user(email, password)
-                    if token:
+                    # The password was just hashed; issue the token without checking it again
+                    profile = get_user_profile(email)
+                    if profile:
+                        token = create_token(email)
                         st.session_state.update({
                             "token": token,
+                            "refresh_token": create_refresh_token(profile["id"]),
                             "email": email,
                             "show_chat": True,
                             "show_auth": False,
-                            "messages": [],
                             "current_language": selected_language,
                             "user_language_set": True
                         })
+                        reset_chat_history()
                         
-                        user_id = get_user_id(email)
+                        user_id = profile["id"]
                         st.session_state.user_id = user_id
                         
                         try:
@@ -285,11 +397,7 @@ elif "token" in st.session_state and st.session_state.show_chat:
     col1, col2, col3 = st.columns([1,2,1])
     with col1:
         if st.button("🔙 Logout", key="chat_logout_btn"):
-            for key in list(st.session_state.keys()): 
-                if key not in ['current_language', 'show_chat', 'show_auth', 'user_language_set', 'show_admin', 'admin_authenticated']:
-                    del st.session_state[key]
-            st.session_state.show_chat = False
-            st.session_state.show_auth = False
+            end_session()
             st.rerun()
     with col2:
         st.markdown("<h1 class='main-title'>💬 Wellness Chat</h1>", unsafe_allow_html=True)
@@ -301,7 +409,13 @@ elif "token" in st.session_state and st.session_state.show_chat:
     # Display messages
     chat_container = st.container()
     with chat_container:
-        for i, message in enumerate(st.session_state.messages):
+        if st.session_state.has_older_messages and st.session_state.conversation_id:
+            older_text = "⬆️ Load older messages" if st.session_state.current_language == "English" else "⬆️ पुराने संदेश देखें"
+            if st.button(older_text, key="load_older_btn"):
+                load_older_messages()
+                st.rerun()
+
+        for i, message in enumerate(st.session_state.older_messages + st.session_state.messages):
             if message["role"] == "user":
                 st.markdown(f"<div class='user-message'>{message['content']}</div>", unsafe_allow_html=True)
             else:
@@ -419,19 +533,24 @@ elif "token" in st.session_state and st.session_state.show_chat:
         original_input = user_input
 
         st.session_state.messages.append({"role": "user", "content": original_input})
-        log_message(st.session_state.conversation_id, "user", original_input)
-
-        if st.session_state.current_language == "Hindi":
-            try: 
-                user_input_en = translator.translate(original_input)
-            except: 
-                user_input_en = original_input
-        else:
-            user_input_en = original_input
-
-        response = get_response(user_input_en, st.session_state.current_language)
-        log_message(st.session_state.conversation_id, "bot", response)
+        st.markdown(f"<div class='user-message'>{original_input}</div>", unsafe_allow_html=True)
+
+        # Render the reply section by section as the pipeline produces it
+        reply_placeholder = st.empty()
+        response = ""
+        timings = {}
+        for section in stream_chat_turn(
+            st.session_state.conversation_id,
+            original_input,
+            st.session_state.current_language,
+            timings
+        ):
+            response += section
+            reply_placeholder.markdown(f"<div class='bot-message'>{response}</div>", unsafe_allow_html=True)
+
+        st.session_state.last_turn_timings = timings
         st.session_state.messages.append({"role": "assistant", "content": response})
+        trim_chat_window()
 
         st.rerun()
 
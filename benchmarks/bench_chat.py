@@ -0,0 +1,125 @@
+"""
+Chat hot path benchmark: get_response latency and throughput.
+
+Runs against a stub Rasa server and a stub translator (see harness.py) in a
+temporary copy of the data, for English and Hindi inputs, single- and
+multi-symptom queries, and knowledge bases grown synthetically to each size.
+"uncached" times generate_response (the full pipeline), "cached" times
+get_response once the reply is in the response cache.
+
+Before timing, the replies to REPLY_CHECKS are checked against the real
+knowledge base: each must cover exactly the listed topics, one section each.
+
+Usage:
+    python benchmarks/bench_chat.py [--sizes 18,100,1000,10000] [--rounds 200]
+        [--rasa-latency-ms 0] [--translate-latency-ms 0] [--check] [--json] [--output report.json]
+"""
+import argparse
+import sys
+import time
+
+from harness import (StubRasaServer, emit, isolated_workdir, latency_summary, stub_translator,
+                     synthetic_knowledge_base, write_knowledge_base)
+
+from utils.kb_index import get_kb_index
+from utils.response_generator import generate_response, get_response, get_response_with_metadata
+from utils.translation_cache import get_translation_cache
+
+# (scenario, message, target language)
+SCENARIOS = [
+    ("english_single", "I have fever", "English"),
+    ("english_multi", "I have fever, headache and back pain", "English"),
+    ("english_fallback", "my lower back pain gets worse after sitting", "English"),
+    ("hindi_single", "मुझे बुखार है", "Hindi"),
+    ("hindi_multi", "मुझे बुखार और सिरदर्द है", "Hindi"),
+    ("roman_hindi", "mujhe bukhar hai", "Hindi"),
+]
+
+# (message, target language, knowledge base topics its reply must cover, in order)
+REPLY_CHECKS = [
+    ("I have fever and high temperature", "English", ["fever"]),
+    ("I have a cold, a runny nose and a cough", "English", ["cold"]),
+    ("I have fever, headache and back pain", "English", ["fever", "headache", "back pain"]),
+    ("मुझे बुखार और तेज बुखार है", "Hindi", ["fever"]),
+]
+
+
+def check_replies():
+    """Replies to REPLY_CHECKS with the wrong topics or a repeated section"""
+    wrong = []
+    for message, language, expected in REPLY_CHECKS:
+        response, metadata = get_response_with_metadata(message, language)
+        sections = response.count("🩺")
+        if metadata["topics"] != expected or sections != len(expected):
+            wrong.append({"text": message, "expected": expected, "topics": metadata["topics"], "sections": sections})
+    return wrong
+
+
+def measure(fn, message, language, rounds):
+    timings = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        call_start = time.perf_counter()
+        fn(message, language)
+        timings.append((time.perf_counter() - call_start) * 1000)
+    return latency_summary(timings, time.perf_counter() - start)
+
+
+def run(sizes, rounds):
+    results = []
+    for size in sizes:
+        write_knowledge_base(synthetic_knowledge_base(size))
+        get_kb_index().invalidate()
+
+        # First call rebuilds the index and symptom extractor for this knowledge base
+        start = time.perf_counter()
+        generate_response(SCENARIOS[0][1], SCENARIOS[0][2])
+        warmup_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        for scenario, message, language in SCENARIOS:
+            uncached = measure(generate_response, message, language, rounds)
+            get_response(message, language)
+            cached = measure(get_response, message, language, rounds)
+            results.append({
+                "kb_size": size,
+                "scenario": scenario,
+                "warmup_ms": warmup_ms,
+                "uncached": uncached,
+                "cached": cached,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark get_response across languages, queries and KB sizes")
+    parser.add_argument("--sizes", default="18,100,1000,10000")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--rasa-latency-ms", type=float, default=0.0, help="delay added by the stub Rasa server")
+    parser.add_argument("--translate-latency-ms", type=float, default=0.0, help="delay added by the stub translator")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any REPLY_CHECKS reply is wrong")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    with StubRasaServer(latency_ms=args.rasa_latency_ms), isolated_workdir():
+        get_translation_cache().set_backend(stub_translator(args.translate_latency_ms))
+        wrong = check_replies()
+        results = run([int(s) for s in args.sizes.split(",")], args.rounds)
+
+    emit(results, args.json, args.output)
+    if not args.json:
+        for r in results:
+            print(f"{r['kb_size']:>6} {r['scenario']:<17} uncached p50 {r['uncached']['p50_ms']:>8} ms "
+                  f"p99 {r['uncached']['p99_ms']:>8} ms {r['uncached']['per_second']:>9}/s | "
+                  f"cached p50 {r['cached']['p50_ms']:>7} ms")
+        print(f"reply checks: {len(REPLY_CHECKS) - len(wrong)}/{len(REPLY_CHECKS)} ok")
+    for w in wrong:
+        print(f"  wrong reply: {w['text']!r} expected {w['expected']}, got {w['topics']} in {w['sections']} sections",
+              file=sys.stderr)
+
+    if args.check and wrong:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
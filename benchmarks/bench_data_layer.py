@@ -0,0 +1,144 @@
+"""
+Data layer benchmark: message/feedback write rates and dashboard statistics
+as the messages table grows.
+
+Runs in a temporary database (see harness.py):
+- writes: log_message / store_feedback calls per second as seen by the caller
+  (enqueue), and rows per second until the background logger has flushed them
+- statistics: the messages table is grown to each row count with synthetic
+  rows, the rollups are rebuilt, then AdminDatabase.get_usage_statistics is
+  timed, next to the raw GROUP BY over messages that the rollups replace.
+  get_usage_statistics needs the dashboard dependencies (streamlit, pandas)
+  and is reported as skipped without them.
+
+Usage:
+    python benchmarks/bench_data_layer.py [--writes 20000] [--rows 10000,100000,1000000]
+        [--rounds 20] [--json] [--output report.json]
+"""
+import argparse
+import time
+
+from harness import emit, isolated_workdir, latency_summary
+
+from utils.auth import init_db, register_user
+from utils.db import get_connection, transaction
+from utils.db_ops import flush_logs, log_message, start_conversation, store_feedback
+from utils.rollups import rebuild_rollups
+
+# Synthetic messages: alternating user/bot rows over 1000 conversations, 500 distinct queries and 365 days
+SEED_MESSAGES = '''
+    INSERT INTO messages (conversation_id, sender, message_content, timestamp)
+    WITH RECURSIVE seq(n) AS (SELECT ? UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+    SELECT 1 + n % 1000,
+           CASE WHEN n % 2 = 0 THEN 'user' ELSE 'bot' END,
+           'I have symptom ' || (n % 500),
+           datetime('2024-01-01', '+' || (n % 365) || ' days', '+' || (n % 86400) || ' seconds')
+    FROM seq
+'''
+
+RAW_DAILY_COUNTS = "SELECT DATE(timestamp), COUNT(*) FROM messages WHERE sender = 'user' GROUP BY DATE(timestamp)"
+
+
+def write_rates(writes):
+    """Caller-side and end-to-end rates of the write-behind message logger"""
+    register_user("bench@example.com", "password", "Bench", "English", "26-35")
+    conversation_id = start_conversation(1)
+    results = []
+    for operation, write in [
+        ("log_message", lambda i: log_message(conversation_id, "user", f"I have symptom {i % 500}")),
+        ("store_feedback", lambda i: store_feedback(1, f"query {i}", "reply", "up" if i % 3 else "down", "")),
+    ]:
+        timings = []
+        start = time.perf_counter()
+        for i in range(writes):
+            call_start = time.perf_counter()
+            write(i)
+            timings.append((time.perf_counter() - call_start) * 1000)
+        enqueued = time.perf_counter() - start
+        flush_logs()
+        flushed = time.perf_counter() - start
+        results.append({
+            "benchmark": "writes",
+            "operation": operation,
+            "caller": latency_summary(timings, enqueued),
+            "rows_per_second_flushed": round(writes / flushed, 1),
+        })
+    return results
+
+
+def usage_statistics(row_counts, rounds):
+    try:
+        from admin_dashboard import AdminDatabase
+        admin_db = AdminDatabase()
+    except ImportError as e:
+        admin_db = None
+        skipped = f"skipped ({e})"
+
+    results = []
+    seeded = get_connection().execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    for rows in row_counts:
+        seed_s = None
+        if rows > seeded:
+            start = time.perf_counter()
+            with transaction() as conn:
+                conn.execute(SEED_MESSAGES, (seeded, rows - 1))
+                rebuild_rollups(conn)
+            seed_s = round(time.perf_counter() - start, 2)
+            seeded = rows
+
+        conn = get_connection()
+        start = time.perf_counter()
+        conn.execute(RAW_DAILY_COUNTS).fetchall()
+        raw_ms = round((time.perf_counter() - start) * 1000, 3)
+
+        if admin_db is None:
+            stats = skipped
+        else:
+            timings = []
+            start = time.perf_counter()
+            for _ in range(rounds):
+                call_start = time.perf_counter()
+                admin_db.get_usage_statistics()
+                timings.append((time.perf_counter() - call_start) * 1000)
+            stats = latency_summary(timings, time.perf_counter() - start)
+
+        results.append({
+            "benchmark": "usage_statistics",
+            "message_rows": rows,
+            "seed_and_rollup_rebuild_s": seed_s,
+            "raw_daily_group_by_ms": raw_ms,
+            "get_usage_statistics": stats,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark message logging and dashboard statistics")
+    parser.add_argument("--writes", type=int, default=20000, help="log_message / store_feedback calls to time")
+    parser.add_argument("--rows", default="10000,100000,1000000", help="message row counts, e.g. add 10000000")
+    parser.add_argument("--rounds", type=int, default=20, help="get_usage_statistics calls per row count")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    with isolated_workdir():
+        init_db()
+        results = write_rates(args.writes)
+        results += usage_statistics(sorted(int(r) for r in args.rows.split(",")), args.rounds)
+
+    emit(results, args.json, args.output)
+    if args.json:
+        return
+    for r in results:
+        if r["benchmark"] == "writes":
+            print(f"{r['operation']:>15}: {r['caller']['per_second']:>10}/s enqueued "
+                  f"(p99 {r['caller']['p99_ms']} ms), {r['rows_per_second_flushed']:>10}/s flushed")
+        else:
+            stats = r["get_usage_statistics"]
+            stats = f"p50 {stats['p50_ms']} ms" if isinstance(stats, dict) else stats
+            print(f"{r['message_rows']:>10} rows: get_usage_statistics {stats}, "
+                  f"raw GROUP BY {r['raw_daily_group_by_ms']} ms (seeded in {r['seed_and_rollup_rebuild_s']} s)")
+
+
+if __name__ == "__main__":
+    main()
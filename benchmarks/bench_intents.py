@@ -0,0 +1,139 @@
+"""
+Intent short-circuit benchmark: rule engine accuracy on a regression corpus,
+classification time, and that emergencies are answered without network I/O.
+
+- accuracy: utils/intent_rules.py and the previous substring checks (kept below as
+  legacy_classify) on intent_samples.jsonl next to this file, one
+  {"text": ..., "intent": "greet" | "thank" | "goodbye" | "emergency" | null} per line
+- speed: classification time per message
+- emergency I/O: every emergency sample goes through run_chat_turn in Hindi and
+  English, in a temporary database; the NLU client's calls and the translator's
+  misses must stay at 0
+
+Usage:
+    python benchmarks/bench_intents.py [--samples FILE] [--rounds 200] [--check] [--json] [--output report.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from harness import StubRasaServer, emit, isolated_workdir, latency_summary, stub_translator
+
+from utils.intent_rules import IntentRules
+
+SAMPLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_samples.jsonl")
+RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "intent_rules.json")
+
+
+def legacy_classify(text):
+    """Greeting and emergency checks as they were in iter_response before utils/intent_rules.py"""
+    greetings = ["hi", "hello", "hey", "namaste", "नमस्ते"]
+    if any(word in text.lower() for word in greetings):
+        return "greet"
+    EMERGENCY_KEYWORDS = [
+        'heart attack', 'chest pain', 'bleeding', 'unconscious',
+        'stroke', 'severe pain', 'emergency', 'सांस नहीं', 'दिल का दौरा'
+    ]
+    if any(word in text.lower() for word in EMERGENCY_KEYWORDS):
+        return "emergency"
+    return None
+
+
+def load_samples(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def accuracy(classify, samples):
+    wrong = []
+    for sample in samples:
+        intent = classify(sample["text"])
+        if intent != sample["intent"]:
+            wrong.append({"text": sample["text"], "expected": sample["intent"], "got": intent})
+    return {
+        "accuracy": round(1 - len(wrong) / len(samples), 4),
+        "missed_emergencies": sum(1 for w in wrong if w["expected"] == "emergency"),
+        "wrong": wrong,
+    }
+
+
+def speed(classify, samples, rounds):
+    texts = [s["text"] for s in samples]
+    timings = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            call_start = time.perf_counter()
+            classify(text)
+            timings.append((time.perf_counter() - call_start) * 1000)
+    return latency_summary(timings, time.perf_counter() - start)
+
+
+def emergency_io(samples):
+    """NLU calls and translator misses while answering the emergency samples"""
+    with StubRasaServer(), isolated_workdir():
+        from utils.auth import init_db
+        from utils.chat_pipeline import run_chat_turn
+        from utils.db_ops import flush_logs
+        from utils.nlu_client import get_nlu_client
+        from utils.translation_cache import get_translation_cache
+
+        init_db()
+        get_translation_cache().set_backend(stub_translator())
+        nlu_calls = get_nlu_client().stats["calls"]
+        misses = get_translation_cache().stats["misses"]
+        emergencies = [s["text"] for s in samples if s["intent"] == "emergency"]
+        paths = {}
+        for language in ("English", "Hindi"):
+            for text in emergencies:
+                metadata = {}
+                run_chat_turn(1, text, language, metadata=metadata)
+                paths[metadata["path"]] = paths.get(metadata["path"], 0) + 1
+        flush_logs()
+        return {
+            "turns": 2 * len(emergencies),
+            "paths": paths,
+            "nlu_calls": get_nlu_client().stats["calls"] - nlu_calls,
+            "translator_calls": get_translation_cache().stats["misses"] - misses,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the greeting/thanks/goodbye/emergency rule engine")
+    parser.add_argument("--samples", default=SAMPLES_PATH, help="JSON lines file of {text, intent}")
+    parser.add_argument("--rounds", type=int, default=200, help="passes over the samples for the timing")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 on any misclassified sample or emergency I/O")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    rules = IntentRules.load(RULES_PATH)
+    results = [
+        dict({"benchmark": "classify", "classifier": name, "samples": len(samples),
+              "speed": speed(classify, samples, args.rounds)}, **accuracy(classify, samples))
+        for name, classify in [("intent_rules", rules.classify), ("legacy", legacy_classify)]
+    ]
+    results.append(dict({"benchmark": "emergency_io"}, **emergency_io(samples)))
+
+    emit(results, args.json, args.output)
+    if not args.json:
+        for r in results[:2]:
+            print(f"{r['classifier']:>12}: accuracy {r['accuracy']:.1%}, missed emergencies {r['missed_emergencies']}, "
+                  f"p50 {r['speed']['p50_ms'] * 1000:.1f} us, {r['speed']['per_second']:.0f}/s")
+        for w in results[0]["wrong"]:
+            print(f"  wrong: {w['text']!r} expected {w['expected']}, got {w['got']}")
+        io = results[2]
+        print(f"emergency turns: {io['turns']} ({io['paths']}), NLU calls {io['nlu_calls']}, "
+              f"translator calls {io['translator_calls']}")
+
+    io = results[2]
+    if args.check and (results[0]["wrong"] or io["nlu_calls"] or io["translator_calls"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
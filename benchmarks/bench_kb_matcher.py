@@ -0,0 +1,110 @@
+"""
+Knowledge base matcher benchmark.
+
+Compares the old approach (one alternation regex per topic) with the
+KeywordAutomaton used by KnowledgeBaseIndex, for knowledge bases grown
+synthetically from the real data/knowledge_base.json.
+
+Usage:
+    python benchmarks/bench_kb_matcher.py [--sizes 18,100,1000,5000] [--json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.keyword_matcher import KeywordAutomaton
+
+KB_PATH = "data/knowledge_base.json"
+
+QUERIES = [
+    "I have a fever and a bad headache since yesterday",
+    "my lower back pain gets worse after sitting all day",
+    "sore throat, runny nose and a little cough",
+    "I feel stressed and can't sleep at night",
+    "what should I eat to stay healthy",
+]
+
+
+def synthetic_knowledge_base(size):
+    """Real topics first, then generated topics with distinct keywords"""
+    with open(KB_PATH, "r", encoding="utf-8") as f:
+        knowledge_base = json.load(f)
+    i = 0
+    while len(knowledge_base) < size:
+        knowledge_base[f"condition {i}"] = {
+            "keywords": [f"symptom{i}a", f"symptom{i}b", f"sign {i} pain"],
+        }
+        i += 1
+    return dict(list(knowledge_base.items())[:size])
+
+
+def build_regex(knowledge_base):
+    patterns = []
+    for topic, data in knowledge_base.items():
+        keywords = [topic] + data.get("keywords", [])
+        patterns.append((topic, re.compile(r'\b(' + '|'.join(re.escape(k) for k in keywords) + r')\b', re.IGNORECASE)))
+    return patterns
+
+
+def build_automaton(knowledge_base):
+    automaton = KeywordAutomaton()
+    for position, (topic, data) in enumerate(knowledge_base.items()):
+        for keyword in [topic] + data.get("keywords", []):
+            automaton.add(keyword.lower(), position)
+    return automaton.build()
+
+
+def time_lookups(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            fn(query)
+    return (time.perf_counter() - start) / (rounds * len(QUERIES)) * 1e6
+
+
+def run(sizes, rounds):
+    results = []
+    for size in sizes:
+        knowledge_base = synthetic_knowledge_base(size)
+        patterns = build_regex(knowledge_base)
+        automaton = build_automaton(knowledge_base)
+
+        # Both matchers must agree before timing means anything
+        for query in QUERIES:
+            expected = {i for i, (_, p) in enumerate(patterns) if p.search(query.lower())}
+            assert automaton.find_values(query.lower()) == expected, query
+
+        regex_us = time_lookups(lambda q: [t for t, p in patterns if p.search(q.lower())], max(1, rounds // max(1, size // 100)))
+        automaton_us = time_lookups(lambda q: automaton.find_values(q.lower()), rounds)
+        results.append({
+            "topics": len(knowledge_base),
+            "regex_us_per_query": round(regex_us, 2),
+            "automaton_us_per_query": round(automaton_us, 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark knowledge base keyword matching")
+    parser.add_argument("--sizes", default="18,100,1000,5000", help="comma-separated topic counts")
+    parser.add_argument("--rounds", type=int, default=200, help="lookup rounds per size")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run([int(s) for s in args.sizes.split(",")], args.rounds)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'topics':>8} {'regex µs/query':>16} {'automaton µs/query':>20}")
+    for row in results:
+        print(f"{row['topics']:>8} {row['regex_us_per_query']:>16} {row['automaton_us_per_query']:>20}")
+
+
+if __name__ == "__main__":
+    main()
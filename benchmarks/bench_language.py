@@ -0,0 +1,112 @@
+"""
+Language detection benchmark: accuracy on a labelled sample set and calls per second.
+
+The detector in utils/language_detector.py is compared with the previous
+implementation (a per-character Devanagari scan plus substring checks for
+Roman Hindi, kept below as legacy_detect_language). English messages detected
+as Hindi are counted separately: each one sends the reply through the Hindi
+localizer, and through the translator for anything missing from its catalog.
+
+The sample set is language_samples.jsonl next to this file, one
+{"text": ..., "language": ...} per line; add the messages that get misdetected.
+
+Usage:
+    python benchmarks/bench_language.py [--samples FILE] [--rounds 200] [--check] [--json] [--output report.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from harness import emit, latency_summary
+
+from utils.language_detector import detect_language
+
+SAMPLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "language_samples.jsonl")
+
+# --check fails below this accuracy
+MIN_ACCURACY = 0.97
+
+
+def legacy_detect_language(text):
+    """detect_language as it was before utils/language_detector.py"""
+    def contains_hindi(text):
+        return any('\u0900' <= ch <= '\u097f' for ch in text)
+
+    def is_roman_hindi(text):
+        roman_words = ["mujhe", "bukhar", "sardi", "sir", "dard", "thoda", "hai", "nahi", "jal", "pani", "thakan"]
+        return any(word in text.lower() for word in roman_words)
+
+    return "Hindi" if contains_hindi(text) or is_roman_hindi(text) else "English"
+
+
+def load_samples(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def accuracy(detect, samples):
+    per_language = {}
+    misdetected = []
+    for sample in samples:
+        expected = sample["language"]
+        detected = detect(sample["text"])
+        counts = per_language.setdefault(expected, {"samples": 0, "correct": 0})
+        counts["samples"] += 1
+        if detected == expected:
+            counts["correct"] += 1
+        else:
+            misdetected.append({"text": sample["text"], "expected": expected, "detected": detected})
+    correct = sum(c["correct"] for c in per_language.values())
+    return {
+        "accuracy": round(correct / len(samples), 4),
+        "per_language": {lang: round(c["correct"] / c["samples"], 4) for lang, c in sorted(per_language.items())},
+        "english_detected_as_hindi": sum(1 for m in misdetected if m["expected"] == "English" and m["detected"] == "Hindi"),
+        "misdetected": misdetected,
+    }
+
+
+def throughput(detect, samples, rounds):
+    texts = [s["text"] for s in samples]
+    timings = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            call_start = time.perf_counter()
+            detect(text)
+            timings.append((time.perf_counter() - call_start) * 1000)
+    return latency_summary(timings, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark language detection accuracy and speed")
+    parser.add_argument("--samples", default=SAMPLES_PATH, help="JSON lines file of {text, language}")
+    parser.add_argument("--rounds", type=int, default=200, help="passes over the samples for the timing")
+    parser.add_argument("--check", action="store_true", help=f"exit with status 1 below {MIN_ACCURACY:.0%} accuracy")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    results = [
+        dict({"detector": name, "samples": len(samples), "speed": throughput(detect, samples, args.rounds)},
+             **accuracy(detect, samples))
+        for name, detect in [("language_detector", detect_language), ("legacy", legacy_detect_language)]
+    ]
+
+    emit(results, args.json, args.output)
+    if not args.json:
+        for r in results:
+            print(f"{r['detector']:>17}: accuracy {r['accuracy']:.1%} {r['per_language']}, "
+                  f"English detected as Hindi {r['english_detected_as_hindi']}, "
+                  f"p50 {r['speed']['p50_ms'] * 1000:.1f} us, {r['speed']['per_second']:.0f}/s")
+        for m in results[0]["misdetected"]:
+            print(f"  misdetected: {m['text']!r} expected {m['expected']}, got {m['detected']}")
+
+    if args.check and results[0]["accuracy"] < MIN_ACCURACY:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+NLU mode benchmark: Rasa over HTTP vs. the model loaded in-process.
+
+HTTP mode needs `rasa run --enable-api` listening on RASA_URL; in-process
+mode needs the `rasa` package and a trained model in RASA_MODEL_PATH.
+Modes that are not available are reported as skipped.
+
+Usage:
+    python benchmarks/bench_nlu_modes.py [--rounds 20] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.nlu_client import InProcessNLUClient, RasaNLUClient
+
+MESSAGES = [
+    "I have fever",
+    "I have severe headache",
+    "I have back pain for 2 weeks",
+    "I feel tired and stressed",
+    "I can't sleep",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def measure(client, rounds):
+    # Warm up connections / model caches before timing
+    if client.parse(MESSAGES[0]) is None:
+        return None
+    timings = []
+    for _ in range(rounds):
+        for message in MESSAGES:
+            start = time.perf_counter()
+            client.parse(message)
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "calls": len(timings),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTTP and in-process Rasa NLU latency")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    results["http"] = measure(RasaNLUClient(timeout_budget=5.0), args.rounds) or "skipped (Rasa server not reachable)"
+    try:
+        results["inprocess"] = measure(InProcessNLUClient(timeout_budget=5.0), args.rounds) or "skipped (parse failed)"
+    except Exception as e:
+        results["inprocess"] = f"skipped ({e})"
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for mode, result in results.items():
+        if isinstance(result, dict):
+            print(f"{mode:>10}: mean {result['mean_ms']} ms, p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms")
+        else:
+            print(f"{mode:>10}: {result}")
+
+
+if __name__ == "__main__":
+    main()
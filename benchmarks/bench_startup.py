@@ -0,0 +1,147 @@
+"""
+Startup benchmark: import time of app.py's modules and the first render of the app.
+
+- imports: each measurement runs in a fresh interpreter (`python -X importtime`),
+  so nothing is already in sys.modules. "app" is every top-level import of app.py
+  except streamlit itself; the heavy optional libraries that must stay off that
+  path (pandas, plotly, deep_translator, requests, rasa) are listed if they got loaded.
+- render: with streamlit installed, app.py is run headless with AppTest in a
+  temporary copy of the data, once cold (first session of the process) and once
+  as a rerun (what every click costs). Reported as skipped without streamlit.
+
+Budgets are checked with --check, which exits with status 1 when one is exceeded.
+
+Usage:
+    python benchmarks/bench_startup.py [--rounds 5] [--check] [--json] [--output report.json]
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from harness import REPO_ROOT, StubRasaServer, emit, isolated_workdir, stub_translator
+
+# Budgets in milliseconds (median over the rounds)
+IMPORT_BUDGET_MS = 500
+FIRST_RENDER_BUDGET_MS = 2000
+RERUN_BUDGET_MS = 200
+
+# Imported only when a feature needs them (dashboard, first translation, first Rasa call, in-process NLU)
+LAZY_MODULES = ("pandas", "plotly", "deep_translator", "requests", "rasa")
+
+
+def app_imports(path=os.path.join(REPO_ROOT, "app.py")):
+    """Modules app.py imports at top level, without streamlit"""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return [m for m in dict.fromkeys(modules) if m.split(".")[0] != "streamlit"]
+
+
+def import_time(modules):
+    """Total import time (ms) of modules in a fresh interpreter, and the lazy modules that were loaded"""
+    code = ("import sys\n" + "".join(f"import {m}\n" for m in modules) +
+            f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_ROOT,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total_us = 0
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"; top-level modules have no indent
+        parts = line.split("|")
+        if len(parts) == 3 and line.startswith("import time:") and parts[0][12:].strip().isdigit():
+            if not parts[2].startswith("  "):
+                total_us += int(parts[1])
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return total_us / 1000.0, loaded
+
+
+def imports(rounds):
+    results = []
+    targets = [("app", app_imports())] + [(m, [m]) for m in app_imports() if m.startswith("utils.")]
+    for name, modules in targets:
+        timings, loaded = [], []
+        for _ in range(rounds):
+            ms, loaded = import_time(modules)
+            timings.append(ms)
+        results.append({
+            "benchmark": "import",
+            "target": name,
+            "median_ms": round(statistics.median(timings), 1),
+            "max_ms": round(max(timings), 1),
+            "lazy_modules_loaded": loaded,
+            "budget_ms": IMPORT_BUDGET_MS if name == "app" else None,
+        })
+    return results
+
+
+def render(rounds):
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError as e:
+        return [{"benchmark": "render", "skipped": str(e)}]
+
+    sys.path.insert(0, REPO_ROOT)
+    from utils.translation_cache import get_translation_cache
+    get_translation_cache().set_backend(stub_translator())
+
+    with StubRasaServer(), isolated_workdir():
+        app = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=60)
+        start = time.perf_counter()
+        app.run()
+        first_ms = (time.perf_counter() - start) * 1000
+        reruns = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            app.run()
+            reruns.append((time.perf_counter() - start) * 1000)
+        exceptions = [str(e.value) for e in app.exception]
+    return [
+        {"benchmark": "render", "target": "first_render", "median_ms": round(first_ms, 1),
+         "budget_ms": FIRST_RENDER_BUDGET_MS, "exceptions": exceptions},
+        {"benchmark": "render", "target": "rerun", "median_ms": round(statistics.median(reruns), 1),
+         "max_ms": round(max(reruns), 1), "budget_ms": RERUN_BUDGET_MS},
+    ]
+
+
+def over_budget(results):
+    return [r for r in results if r.get("budget_ms") and r["median_ms"] > r["budget_ms"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app.py import time and first-render cost")
+    parser.add_argument("--rounds", type=int, default=5, help="fresh interpreters per import target, reruns to time")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if a budget is exceeded")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    results = imports(args.rounds) + render(args.rounds)
+    emit(results, args.json, args.output)
+    if not args.json:
+        for r in results:
+            if "skipped" in r:
+                print(f"{r['benchmark']}: skipped ({r['skipped']})")
+                continue
+            budget = f" (budget {r['budget_ms']} ms)" if r.get("budget_ms") else ""
+            lazy = f", loaded {', '.join(r['lazy_modules_loaded'])}" if r.get("lazy_modules_loaded") else ""
+            print(f"{r['benchmark']:>6} {r['target']:<26} {r['median_ms']:>8} ms{budget}{lazy}")
+
+    exceeded = over_budget(results)
+    if args.check and exceeded:
+        for r in exceeded:
+            print(f"over budget: {r['benchmark']} {r['target']} {r['median_ms']} ms > {r['budget_ms']} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
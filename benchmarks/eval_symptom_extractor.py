@@ -0,0 +1,93 @@
+"""
+Precision/recall of the local symptom extractor against the annotated
+user messages in y/tests/*.yml ([text](symptom) annotations).
+
+Messages without annotations count as negatives, so greetings that the
+extractor tags as symptoms lower precision.
+
+Usage:
+    python benchmarks/eval_symptom_extractor.py [--tests-dir y/tests] [--verbose] [--json]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.symptom_extractor import CONFIDENCE_THRESHOLD, get_symptom_extractor
+
+ANNOTATION = re.compile(r"\[([^\]]+)\]\((\w+)\)")
+
+
+def load_examples(tests_dir):
+    """(plain text, set of gold symptom strings) for every user turn in the test stories"""
+    examples = []
+    for path in sorted(glob.glob(os.path.join(tests_dir, "*.yml"))):
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        for story in data.get("stories", []):
+            for step in story.get("steps", []):
+                if "user" not in step:
+                    continue
+                annotated = step["user"].strip()
+                gold = {m.group(1).lower() for m in ANNOTATION.finditer(annotated) if m.group(2) == "symptom"}
+                text = ANNOTATION.sub(lambda m: m.group(1), annotated)
+                examples.append((text, gold))
+    return examples
+
+
+def evaluate(examples, verbose=False):
+    extractor = get_symptom_extractor()
+    true_pos = false_pos = false_neg = 0
+    confident = 0
+    start = time.perf_counter()
+    predictions = [extractor.extract(text) for text, _ in examples]
+    elapsed = time.perf_counter() - start
+
+    for (text, gold), entities in zip(examples, predictions):
+        # Compare on the matched span of the input, since values are normalized to gazetteer entries
+        found = {text.lower()[e["start"]:e["end"]] for e in entities}
+        true_pos += len(found & gold)
+        false_pos += len(found - gold)
+        false_neg += len(gold - found)
+        if entities and min(e["confidence_entity"] for e in entities) >= CONFIDENCE_THRESHOLD:
+            confident += 1
+        if verbose and found != gold:
+            print(f"  {text!r}: expected {sorted(gold)}, got {sorted(found)}")
+
+    precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 1.0
+    recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "messages": len(examples),
+        "precision": round(precision, 3),
+        "recall": round(recall, 3),
+        "f1": round(f1, 3),
+        "answered_without_rasa": confident,
+        "us_per_message": round(elapsed / max(1, len(examples)) * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the local symptom extractor")
+    parser.add_argument("--tests-dir", default="y/tests")
+    parser.add_argument("--verbose", action="store_true", help="list every mismatched message")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = evaluate(load_examples(args.tests_dir), verbose=args.verbose)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
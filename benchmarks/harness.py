@@ -0,0 +1,183 @@
+"""
+Shared pieces of the benchmark scripts:
+- an isolated working directory (copy of data/ and the NLU training data, empty database/)
+- a local stub of the Rasa HTTP API and a stub translator, with configurable latency
+- synthetic knowledge bases and environment info for the JSON reports
+
+Import this module before anything from utils: it points RASA_URL at the stub.
+"""
+import contextlib
+import json
+import os
+import platform
+import re
+import secrets
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+STUB_RASA_PORT = _free_port()
+os.environ["RASA_URL"] = f"http://127.0.0.1:{STUB_RASA_PORT}"
+os.environ.setdefault("WELLBOT_NLU_MODE", "http")
+# Token signing key for benchmark runs that don't provide one
+os.environ.setdefault("WELLBOT_SECRET_KEY", secrets.token_urlsafe(48))
+
+# Symptom words the stub Rasa server recognizes (including Hindi and Roman Hindi), mapped to entity values
+STUB_SYMPTOMS = {
+    "fever": "fever", "headache": "headache", "cough": "cold", "cold": "cold",
+    "back pain": "back pain", "neck pain": "neck pain", "tired": "tired", "stress": "stress",
+    "bukhar": "fever", "sir dard": "headache", "sardi": "cold", "thakan": "tired",
+    "बुखार": "fever", "सिरदर्द": "headache", "सर्दी": "cold", "खांसी": "cold", "थकान": "tired",
+}
+_STUB_PATTERN = re.compile("|".join(re.escape(k) for k in sorted(STUB_SYMPTOMS, key=len, reverse=True)))
+
+
+class StubRasaServer:
+    """Answers POST /model/parse like `rasa run --enable-api`, after latency_ms"""
+
+    def __init__(self, port=STUB_RASA_PORT, latency_ms=0.0):
+        self.latency = latency_ms / 1000.0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True   # headers and body go out as separate writes
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                text = body.get("text", "")
+                if stub.latency:
+                    time.sleep(stub.latency)
+                entities = [
+                    {"entity": "symptom", "value": STUB_SYMPTOMS[m.group(0)], "start": m.start(), "end": m.end(),
+                     "confidence_entity": 0.99, "extractor": "stub"}
+                    for m in _STUB_PATTERN.finditer(text.lower())
+                ]
+                payload = json.dumps({"text": text, "intent": {"name": "report_symptom"}, "entities": entities}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def stub_translator(latency_ms=0.0):
+    """Translation backend that tags the text instead of calling Google, after latency_ms"""
+    def translate(text, target):
+        if latency_ms:
+            time.sleep(latency_ms / 1000.0)
+        return f"[{target}] {text}"
+    return translate
+
+
+@contextlib.contextmanager
+def isolated_workdir():
+    """Run inside a temporary copy of data/ and y/data/ with an empty database/ directory"""
+    previous = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="wellbot-bench-")
+    shutil.copytree(os.path.join(REPO_ROOT, "data"), os.path.join(workdir, "data"))
+    shutil.copytree(os.path.join(REPO_ROOT, "y", "data"), os.path.join(workdir, "y", "data"))
+    os.makedirs(os.path.join(workdir, "database"))
+    os.chdir(workdir)
+    try:
+        yield workdir
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def synthetic_knowledge_base(size, kb_path=os.path.join(REPO_ROOT, "data", "knowledge_base.json")):
+    """Real topics first, then generated topics with distinct keywords and full reply fields"""
+    with open(kb_path, "r", encoding="utf-8") as f:
+        knowledge_base = json.load(f)
+    i = 0
+    while len(knowledge_base) < size:
+        knowledge_base[f"condition {i}"] = {
+            "keywords": [f"symptom{i}a", f"symptom{i}b", f"sign {i} pain"],
+            "description": f"Condition {i} is a synthetic topic used for benchmarking.",
+            "remedy": "Rest, drink fluids and consult a doctor if it persists.",
+            "prevention": "Keep a healthy routine.",
+        }
+        i += 1
+    return dict(list(knowledge_base.items())[:size])
+
+
+def write_knowledge_base(knowledge_base, kb_path="data/knowledge_base.json"):
+    tmp_path = kb_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(knowledge_base, f, ensure_ascii=False)
+    os.replace(tmp_path, kb_path)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def latency_summary(timings_ms, elapsed_s):
+    """Throughput and latency percentiles of a list of per-call durations (ms)"""
+    return {
+        "calls": len(timings_ms),
+        "per_second": round(len(timings_ms) / elapsed_s, 1) if elapsed_s else None,
+        "mean_ms": round(statistics.mean(timings_ms), 4),
+        "p50_ms": round(percentile(timings_ms, 50), 4),
+        "p95_ms": round(percentile(timings_ms, 95), 4),
+        "p99_ms": round(percentile(timings_ms, 99), 4),
+    }
+
+
+def environment_info():
+    """Commit and machine details, so JSON reports from different commits can be compared"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def emit(results, as_json, output=None):
+    """Write the JSON report (results plus environment) to output and/or print it"""
+    report = {"environment": environment_info(), "results": results}
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if as_json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
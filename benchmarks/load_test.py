@@ -0,0 +1,321 @@
+"""
+Load test: many simultaneous users doing register -> login -> multi-turn chat -> feedback.
+
+Sessions come from a traffic file (JSON lines) and are replayed at a fixed
+arrival rate (open loop, Poisson arrivals) or back to back by every worker
+(closed loop, --rates 0). Give several rates to sweep towards the point
+where throughput stops growing and tail latency takes off.
+
+Traffic file lines are either recorded sessions
+    {"messages": ["I have fever", "since 2 days"], "language": "English", "rating": "up", "comment": ""}
+or requests.jsonl-style records ({"title": ..., "body": ...}), whose
+sentences are used as the chat turns. Without a file, synthetic sessions are used.
+
+Targets:
+- in-process (default): calls register_user, authenticate, start_conversation,
+  run_chat_turn (get_response + log_message) and store_feedback in a temporary
+  database, with the stub Rasa server and translator from harness.py
+- --url http://host:8000: the same flow against a running api_server.py
+
+Write lock contention shows up as time, not errors (busy_timeout makes writers
+wait rather than fail): each step reports the db.write_batch and
+db.start_conversation timers, which include the wait for SQLite's write lock.
+In-process they cover that step only; from /metrics they cover the server's
+most recent writes.
+
+Usage:
+    python benchmarks/load_test.py [--traffic requests.jsonl] [--rates 1,2,4,8] [--concurrency 16]
+        [--duration 30] [--turns 3] [--url URL] [--json] [--output report.json]
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from harness import StubRasaServer, emit, isolated_workdir, latency_summary, stub_translator
+
+SYNTHETIC_MESSAGES = [
+    "I have fever", "I have a bad headache since yesterday", "my lower back pain is worse today",
+    "sore throat and runny nose", "I feel stressed and can't sleep", "I feel tired all the time",
+    "mujhe bukhar hai", "मुझे बुखार और सिरदर्द है", "what should I eat to stay healthy", "hello",
+]
+
+
+def load_sessions(path, turns, seed=0):
+    """Sessions as {"messages", "language", "rating", "comment"} from a traffic file, or synthetic ones"""
+    if not path:
+        rng = random.Random(seed)
+        return [{
+            "messages": rng.sample(SYNTHETIC_MESSAGES, turns),
+            "language": rng.choice(["English", "English", "Hindi"]),
+            "rating": rng.choice(["up", "up", "down"]),
+            "comment": rng.choice(["", "", "not helpful"]),
+        } for _ in range(100)]
+
+    sessions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            messages = record.get("messages")
+            if messages is None:
+                # requests.jsonl-style record: its sentences become the chat turns
+                text = " ".join(filter(None, [record.get("title"), record.get("body")]))
+                messages = [s for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()]
+            if not messages:
+                continue
+            sessions.append({
+                "messages": messages[:turns],
+                "language": record.get("language", "English"),
+                "rating": record.get("rating", "up"),
+                "comment": record.get("comment", ""),
+            })
+    return sessions
+
+
+class Recorder:
+    """Thread-safe per-operation latencies and error counts"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.queue_waits = []
+        self.sessions = {"started": 0, "completed": 0, "failed": 0}
+        self.chat_turns = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def op(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                key = f"{name}:{error_kind(e)}"
+                self.errors[key] = self.errors.get(key, 0) + 1
+            raise
+        ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.latencies.setdefault(name, []).append(ms)
+            if name == "chat":
+                self.chat_turns += 1
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.sessions[key] += amount
+
+
+def error_kind(e):
+    if isinstance(e, sqlite3.OperationalError) and "locked" in str(e):
+        return "sqlite_locked"
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    if status is not None:
+        return f"http_{status}"
+    return type(e).__name__
+
+
+# Timers that include waiting for SQLite's write lock
+LOCK_WAIT_TIMERS = ("db.write_batch", "db.start_conversation")
+
+
+class InProcessTarget:
+    """The user flow as the Streamlit app runs it, against this process's database"""
+
+    def __init__(self):
+        from utils import auth, chat_pipeline, db_ops
+        self.auth, self.chat_pipeline, self.db_ops = auth, chat_pipeline, db_ops
+        auth.init_db()
+
+    def start_step(self):
+        # Each step's timers and counters start from zero
+        from utils.metrics import get_metrics
+        self.db_ops.flush_logs()
+        get_metrics().reset()
+
+    def run(self, n, session, recorder):
+        email = f"load-{uuid.uuid4().hex[:12]}-{n}@example.com"
+        language = session["language"]
+        with recorder.op("register"):
+            if not self.auth.register_user(email, "password", f"Load User {n}", language, "18-25"):
+                raise RuntimeError("register_user failed")
+        with recorder.op("login"):
+            profile = self.auth.authenticate(email, "password")
+            if not profile:
+                raise RuntimeError("authenticate failed")
+        user_id = profile["id"]
+        with recorder.op("start_conversation"):
+            conversation_id = self.db_ops.start_conversation(user_id)
+        response = ""
+        for message in session["messages"]:
+            with recorder.op("chat"):
+                response, _ = self.chat_pipeline.run_chat_turn(conversation_id, message, language)
+        with recorder.op("feedback"):
+            self.db_ops.store_feedback(user_id, session["messages"][-1], response, session["rating"], session["comment"])
+
+    def report(self):
+        from utils.message_logger import get_message_logger
+        from utils.metrics import get_metrics
+        self.db_ops.flush_logs()
+        snapshot = get_metrics().snapshot()
+        return {
+            "message_logger": dict(get_message_logger().stats),
+            "db_write_errors": snapshot["counters"].get("db.write_errors", 0),
+            "lock_wait": {name: snapshot["timers"].get(name) for name in LOCK_WAIT_TIMERS},
+        }
+
+
+class HttpTarget:
+    """The same flow against api_server.py"""
+
+    def __init__(self, url):
+        import requests
+        self.requests = requests
+        self.url = url.rstrip("/")
+
+    def start_step(self):
+        pass
+
+    def run(self, n, session, recorder):
+        email = f"load-{uuid.uuid4().hex[:12]}-{n}@example.com"
+        http = self.requests.Session()
+
+        def post(path, body, token=None):
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            response = http.post(self.url + path, json=body, headers=headers, timeout=60)
+            response.raise_for_status()
+            return response.json()
+
+        with recorder.op("register"):
+            post("/register", {"email": email, "password": "password", "name": f"Load User {n}",
+                               "language": session["language"], "age_group": "18-25"})
+        with recorder.op("login"):
+            login = post("/login", {"email": email, "password": "password"})
+        token, conversation_id = login["token"], login["conversation_id"]
+        reply = ""
+        for message in session["messages"]:
+            with recorder.op("chat"):
+                reply = post("/chat", {"message": message, "conversation_id": conversation_id}, token)["response"]
+        with recorder.op("feedback"):
+            post("/feedback", {"query": session["messages"][-1], "bot_response": reply,
+                               "rating": session["rating"], "comment": session["comment"]}, token)
+
+    def report(self):
+        try:
+            metrics = self.requests.get(self.url + "/metrics", timeout=10).json()
+        except Exception:
+            return {}
+        return {
+            "message_logger": metrics.get("caches", {}).get("message_logger"),
+            "db_write_errors": metrics.get("counters", {}).get("db.write_errors", 0),
+            "lock_wait": {name: metrics.get("timers", {}).get(name) for name in LOCK_WAIT_TIMERS},
+        }
+
+
+def run_step(target, sessions, rate, concurrency, duration, seed):
+    """Replay sessions for duration seconds; rate sessions/s (Poisson), or closed loop when rate is 0"""
+    recorder = Recorder()
+    counter = itertools.count()
+    session_cycle = itertools.cycle(sessions)
+    cycle_lock = threading.Lock()
+
+    def next_session():
+        with cycle_lock:
+            return next(counter), next(session_cycle)
+
+    def run_one(n, session, scheduled):
+        recorder.queue_waits.append((time.perf_counter() - scheduled) * 1000)
+        recorder.count("started")
+        try:
+            target.run(n, session, recorder)
+            recorder.count("completed")
+        except Exception:
+            recorder.count("failed")
+
+    target.start_step()
+    start = time.perf_counter()
+    deadline = start + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if rate > 0:
+            rng = random.Random(seed)
+            arrival = start
+            while True:
+                arrival += rng.expovariate(rate)
+                if arrival >= deadline:
+                    break
+                time.sleep(max(0.0, arrival - time.perf_counter()))
+                n, session = next_session()
+                executor.submit(run_one, n, session, arrival)
+        else:
+            def closed_loop():
+                while time.perf_counter() < deadline:
+                    n, session = next_session()
+                    run_one(n, session, time.perf_counter())
+            for _ in range(concurrency):
+                executor.submit(closed_loop)
+    elapsed = time.perf_counter() - start
+
+    return dict({
+        "arrival_rate": rate or "closed loop",
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "sessions": recorder.sessions,
+        "sessions_per_second": round(recorder.sessions["completed"] / elapsed, 2),
+        "chat_turns_per_second": round(recorder.chat_turns / elapsed, 2),
+        "latency": {name: latency_summary(values, elapsed) for name, values in sorted(recorder.latencies.items())},
+        "queue_wait": latency_summary(recorder.queue_waits, elapsed) if recorder.queue_waits else None,
+        "errors": recorder.errors,
+    }, **target.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay chat sessions at a given arrival rate and concurrency")
+    parser.add_argument("--traffic", help="JSON lines traffic file (default: synthetic sessions)")
+    parser.add_argument("--rates", default="2", help="sessions per second to sweep, 0 for closed loop")
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous sessions")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per rate")
+    parser.add_argument("--turns", type=int, default=3, help="chat turns per session")
+    parser.add_argument("--url", help="base URL of a running api_server.py instead of in-process calls")
+    parser.add_argument("--rasa-latency-ms", type=float, default=50.0, help="in-process: stub Rasa delay")
+    parser.add_argument("--translate-latency-ms", type=float, default=100.0, help="in-process: stub translator delay")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.traffic, args.turns, args.seed)
+    rates = [float(r) for r in args.rates.split(",")]
+
+    def sweep(target):
+        return [run_step(target, sessions, rate, args.concurrency, args.duration, args.seed) for rate in rates]
+
+    if args.url:
+        results = sweep(HttpTarget(args.url))
+    else:
+        with StubRasaServer(latency_ms=args.rasa_latency_ms), isolated_workdir():
+            from utils.translation_cache import get_translation_cache
+            get_translation_cache().set_backend(stub_translator(args.translate_latency_ms))
+            results = sweep(InProcessTarget())
+
+    emit(results, args.json, args.output)
+    if args.json:
+        return
+    for r in results:
+        chat = r["latency"].get("chat")
+        chat = f"chat p50 {chat['p50_ms']:.1f} ms p99 {chat['p99_ms']:.1f} ms" if chat else "no chat turns"
+        lock_wait = ", ".join(f"{name} p50 {t['p50_ms']:.1f} ms p99 {t['p99_ms']:.1f} ms"
+                              for name, t in r.get("lock_wait", {}).items() if t) or "no writes timed"
+        print(f"rate {r['arrival_rate']}: {r['sessions_per_second']} sessions/s, {r['chat_turns_per_second']} turns/s, "
+              f"{chat}, failed {r['sessions']['failed']}, errors {r['errors'] or 'none'}")
+        print(f"  lock wait: {lock_wait}, write errors {r.get('db_write_errors', 0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+
+from utils.localized_kb import (
+    RESPONSE_STRINGS, SUPPORTED_LANGUAGES, TRANSLATIONS_DIR,
+    catalog_path, content_hash, placeholders, topic_source,
+)
+from utils.translation_cache import translate
+
+KB_PATH = "data/knowledge_base.json"
+
+
+def load_catalog(path):
+    """Load a previously built catalog so unchanged entries are reused"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"strings": {}, "topics": {}}
+
+
+def build_language(code, knowledge_base, force=False):
+    """Translate fixed strings and every KB topic into one language, skipping unchanged entries"""
+    path = catalog_path(code)
+    previous = {"strings": {}, "topics": {}} if force else load_catalog(path)
+    catalog = {"language": code, "strings": {}, "topics": {}}
+    counts = {"translated": 0, "reused": 0, "skipped": 0}
+
+    # Fixed system strings
+    for key, source in RESPONSE_STRINGS.items():
+        source_hash = content_hash(source)
+        old = previous["strings"].get(key)
+        if old and old["hash"] == source_hash:
+            catalog["strings"][key] = old
+            counts["reused"] += 1
+            continue
+        text = translate(source, code)
+        # A template whose {placeholders} got mangled is left out and translated at runtime instead
+        if placeholders(text) != placeholders(source):
+            print(f"⚠️  Skipping '{key}': placeholders changed in translation")
+            counts["skipped"] += 1
+            continue
+        catalog["strings"][key] = {"hash": source_hash, "text": text}
+        counts["translated"] += 1
+
+    # Knowledge base topics
+    for topic, data in knowledge_base.items():
+        source = topic_source(topic, data)
+        source_hash = content_hash(source)
+        old = previous["topics"].get(topic)
+        if old and old["hash"] == source_hash:
+            catalog["topics"][topic] = old
+            counts["reused"] += 1
+            continue
+        fields = {field: translate(text, code) if text else text for field, text in source.items()}
+        catalog["topics"][topic] = {"hash": source_hash, "fields": fields}
+        counts["translated"] += 1
+
+    os.makedirs(TRANSLATIONS_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+    return path, counts
+
+
+def main():
+    """Build the pre-translated knowledge base for every supported language"""
+    parser = argparse.ArgumentParser(description="Pre-translate the knowledge base and reply strings")
+    parser.add_argument("--force", action="store_true", help="re-translate everything, ignoring content hashes")
+    args = parser.parse_args()
+
+    print("🌐 Digital Wellness Chatbot - Translation Build")
+    print("=" * 50)
+
+    with open(KB_PATH, "r", encoding="utf-8") as f:
+        knowledge_base = json.load(f)
+
+    for language, code in SUPPORTED_LANGUAGES.items():
+        path, counts = build_language(code, knowledge_base, force=args.force)
+        print(f"✅ {language}: {path} ({counts['translated']} translated, "
+              f"{counts['reused']} unchanged, {counts['skipped']} skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -138,7 +138,12 @@ def create_training_instructions():
        rasa run -m models --enable-api --cors "*"
        ```
 
-    4. START STREAMLIT APP:
+    4. BUILD THE PRE-TRANSLATED KNOWLEDGE BASE (re-run after editing topics):
+       ```bash
+       python build_translations.py
+       ```
+
+    5. START STREAMLIT APP:
        ```bash
        streamlit run app.py
        ```
@@ -1,14 +1,75 @@
-import sqlite3       # For database connection
-import bcrypt         # For password hashing
+import sqlite3       # For database errors
 import jwt            # For token creation
 import datetime       # For token expiry time
+import hashlib        # For storing refresh tokens by hash
+import os
+import secrets        # For refresh token generation
+import threading
+import time
+from collections import OrderedDict
+from utils.db import DB_PATH, get_connection, transaction   # Pooled database connections
+from utils.rollups import CREATE_ROLLUP_TABLES, rebuild_rollups, record_user
+from utils.message_meta import CREATE_META_TABLES
+from utils.metrics import get_metrics
+from utils.password_hashing import check_password, hash_password   # bcrypt in worker processes
+from utils.response_cache import ResponseCache
 
-# Secret key for JWT encoding (keep this safe)
-SECRET_KEY = "mysecretkey"
+# Secret key for JWT encoding, from the environment; anyone who knows it can sign tokens for any user.
+# Generate one with: python -c "import secrets; print(secrets.token_urlsafe(48))"
+SECRET_KEY = os.environ.get("WELLBOT_SECRET_KEY", "")
+MIN_SECRET_KEY_BYTES = 32
 
-# Function to initialize database (creates users table)
+# Recently used user profiles (id, name, language, age_group) by email, so a session
+# doesn't query the users table again for each field
+PROFILE_TTL = 60
+_profiles = ResponseCache(max_entries=10000, ttl=PROFILE_TTL)
+
+# Lifetimes of the JWT access token and of the opaque refresh token that renews it
+ACCESS_TOKEN_TTL = datetime.timedelta(hours=1)
+REFRESH_TOKEN_TTL = datetime.timedelta(days=30)
+
+
+class ClaimsCache:
+    """Claims of verified access tokens, by token, kept until the token expires"""
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is not None and claims["exp"] <= time.time():
+                del self._entries[token]
+                return None
+            return claims
+
+    def put(self, token, claims):
+        with self._lock:
+            self._entries[token] = claims
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_verified_tokens = ClaimsCache()
+
+# Database files whose schema this process has already created and migrated
+_initialized = set()
+_init_lock = threading.Lock()
+
+# Function to initialize database (creates users table), once per database file per process
 def init_db():
-    conn = sqlite3.connect("database/users.db")
+    path = os.path.abspath(DB_PATH)
+    if path in _initialized:
+        return
+    with _init_lock:
+        if path not in _initialized:
+            _create_schema()
+            _initialized.add(path)
+
+def _create_schema():
+    conn = get_connection()
     c = conn.cursor()
 
     # USERS TABLE
@@ -55,50 +116,222 @@ def init_db():
                 )''')
 
     conn.commit()
-    conn.close()
+
+    migrate(conn)
+
+
+# Schema changes applied on top of the base tables, tracked with PRAGMA user_version.
+# A step is a list of SQL statements or functions taking the connection.
+# Append new steps at the end; never edit a step that has already shipped.
+MIGRATIONS = [
+    # 1: indexes for paging chat history and for the dashboard's time/rating queries
+    [
+        "CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (conversation_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_messages_sender_timestamp ON messages (sender, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_conversations_user ON conversations (user_id, start_time)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_user ON feedback (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_rating ON feedback (rating)",
+    ],
+    # 2: rollup tables for the admin usage statistics, backfilled from existing rows
+    CREATE_ROLLUP_TABLES + [rebuild_rollups],
+    # 3: per-message reply metadata (path, latency, matched topics) for topic-level analytics
+    CREATE_META_TABLES,
+    # 4: refresh tokens (stored as SHA-256 hashes), rotated on every use
+    [
+        '''CREATE TABLE IF NOT EXISTS refresh_tokens (
+               token_hash TEXT PRIMARY KEY,
+               user_id INTEGER NOT NULL,
+               family TEXT NOT NULL,
+               expires_at TIMESTAMP NOT NULL,
+               used_at TIMESTAMP,
+               FOREIGN KEY(user_id) REFERENCES users(id)
+           )''',
+        "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_family ON refresh_tokens (family)",
+        "CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user ON refresh_tokens (user_id, expires_at)",
+    ],
+]
+
+
+# Function to bring an existing database up to the latest schema version
+def migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number in range(version + 1, len(MIGRATIONS) + 1):
+        conn.execute("BEGIN")
+        try:
+            for statement in MIGRATIONS[number - 1]:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
 
 # Function to register a new user
 def register_user(email, password, name, language, age_group):
-    conn = sqlite3.connect("database/users.db")
-    c = conn.cursor()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    if get_user_profile(email) is not None:
+        return False
+    with get_metrics().timer("auth.bcrypt_hash"):
+        hashed = hash_password(password)
     try:
-        c.execute("INSERT INTO users (email, password, name, language, age_group) VALUES (?, ?, ?, ?, ?)",
-                  (email, hashed, name, language, age_group))
-        conn.commit()
-        return True
+        with transaction() as conn:
+            c = conn.execute("INSERT INTO users (email, password, name, language, age_group) VALUES (?, ?, ?, ?, ?)",
+                             (email, hashed, name, language, age_group))
+            record_user(conn, age_group, language)
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
+    _profiles.put(email, {"id": c.lastrowid, "email": email, "name": name, "language": language, "age_group": age_group})
+    return True
+
+def check_secret_key():
+    """Raise RuntimeError unless WELLBOT_SECRET_KEY holds at least MIN_SECRET_KEY_BYTES bytes"""
+    if len(SECRET_KEY.encode("utf-8")) < MIN_SECRET_KEY_BYTES:
+        raise RuntimeError(f"Set WELLBOT_SECRET_KEY to a random secret of at least {MIN_SECRET_KEY_BYTES} bytes "
+                           "before starting the server")
+
+# Function to create a JWT access token for a user whose credentials were checked
+def create_token(email):
+    check_secret_key()
+    profile = get_user_profile(email)
+    return jwt.encode({
+        "email": email,
+        "user_id": profile["id"] if profile else None,
+        "language": profile["language"] if profile else None,
+        "type": "access",
+        "exp": datetime.datetime.utcnow() + ACCESS_TOKEN_TTL
+    }, SECRET_KEY, algorithm="HS256")
+
+# Function to check an access token
+def verify_token(token):
+    """
+    Claims (email, user_id, language, exp) of a valid, unexpired access token, else None.
+    Verified claims are cached until the token expires, so repeat requests skip decoding and the DB.
+    """
+    if not token:
+        return None
+    claims = _verified_tokens.get(token)
+    if claims is not None:
+        get_metrics().incr("auth.token_cache_hits")
+        return claims
+    get_metrics().incr("auth.token_cache_misses")
+    check_secret_key()
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    except jwt.PyJWTError:
+        return None
+    if claims.get("type", "access") != "access":
+        return None
+    if claims.get("user_id") is None:
+        # Token issued before user_id was part of the claims
+        profile = get_user_profile(claims.get("email"))
+        if profile is None:
+            return None
+        claims = dict(claims, user_id=profile["id"], language=profile["language"])
+    _verified_tokens.put(token, claims)
+    return claims
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _utc_timestamp(delta=datetime.timedelta(0)):
+    # Same format as SQLite's CURRENT_TIMESTAMP, so timestamps compare as text
+    return (datetime.datetime.utcnow() + delta).strftime("%Y-%m-%d %H:%M:%S")
+
+def _insert_refresh_token(conn, user_id, family):
+    token = secrets.token_urlsafe(32)
+    # Expired tokens of this user are no longer needed for replay detection
+    conn.execute("DELETE FROM refresh_tokens WHERE user_id = ? AND expires_at < ?", (user_id, _utc_timestamp()))
+    conn.execute("INSERT INTO refresh_tokens (token_hash, user_id, family, expires_at) VALUES (?, ?, ?, ?)",
+                 (_token_hash(token), user_id, family, _utc_timestamp(REFRESH_TOKEN_TTL)))
+    return token
+
+# Function to issue the refresh token of a new login
+def create_refresh_token(user_id):
+    with transaction() as conn:
+        return _insert_refresh_token(conn, user_id, secrets.token_hex(8))
+
+# Function to exchange a refresh token for a new access token and refresh token
+def refresh_session(refresh_token):
+    """
+    Rotate a refresh token: returns {"token", "refresh_token", "user_id"} or None.
+    Each refresh token works once; presenting a used one again revokes every token
+    issued from the same login, since it means the token was copied.
+    """
+    if not refresh_token:
+        return None
+    token_hash = _token_hash(refresh_token)
+    now = _utc_timestamp()
+    with transaction() as conn:
+        used = conn.execute(
+            "UPDATE refresh_tokens SET used_at = ? WHERE token_hash = ? AND used_at IS NULL AND expires_at > ?",
+            (now, token_hash, now)
+        ).rowcount
+        row = conn.execute(
+            "SELECT r.user_id, r.family, r.used_at, u.email FROM refresh_tokens r JOIN users u ON u.id = r.user_id WHERE r.token_hash = ?",
+            (token_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        user_id, family, used_at, email = row
+        if not used:
+            get_metrics().incr("auth.refresh_rejected")
+            if used_at is not None:
+                conn.execute("DELETE FROM refresh_tokens WHERE family = ?", (family,))
+            return None
+        new_refresh_token = _insert_refresh_token(conn, user_id, family)
+    return {"token": create_token(email), "refresh_token": new_refresh_token, "user_id": user_id}
+
+# Function to end a session: its refresh token and every token rotated from it stop working
+def revoke_refresh_token(refresh_token):
+    if not refresh_token:
+        return
+    with transaction() as conn:
+        row = conn.execute("SELECT family FROM refresh_tokens WHERE token_hash = ?", (_token_hash(refresh_token),)).fetchone()
+        if row:
+            conn.execute("DELETE FROM refresh_tokens WHERE family = ?", (row[0],))
+
+# Function to check credentials and load the user's profile in one query
+def authenticate(email, password):
+    """Profile dict (id, email, name, language, age_group, token) if the credentials match, else None"""
+    user = get_connection().execute(
+        "SELECT id, password, name, language, age_group FROM users WHERE email = ?", (email,)
+    ).fetchone()
+    if not user:
+        return None
+    with get_metrics().timer("auth.bcrypt_check"):
+        valid = check_password(password, user[1])
+    if not valid:
+        return None
+    profile = {"id": user[0], "email": email, "name": user[2], "language": user[3], "age_group": user[4]}
+    _profiles.put(email, profile)
+    return dict(profile, token=create_token(email))
 
 # Function to verify user login credentials
 def login_user(email, password):
-    conn = sqlite3.connect("database/users.db")
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE email = ?", (email,))
-    user = c.fetchone()
-    conn.close()
-    if user and bcrypt.checkpw(password.encode('utf-8'), user[2]):
-        # Create a JWT token if credentials match
-        token = jwt.encode({
-            "email": email,
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)
-        }, SECRET_KEY, algorithm="HS256")
-        return token
-    return None
+    profile = authenticate(email, password)
+    return profile["token"] if profile else None
+
+# Function to get a user's profile (cached for PROFILE_TTL seconds)
+def get_user_profile(email):
+    profile = _profiles.get(email)
+    if profile is None:
+        row = get_connection().execute(
+            "SELECT id, name, language, age_group FROM users WHERE email = ?", (email,)
+        ).fetchone()
+        if row is None:
+            return None
+        profile = {"id": row[0], "email": email, "name": row[1], "language": row[2], "age_group": row[3]}
+        _profiles.put(email, profile)
+    return profile
+
 def get_user_id(email):
-    conn = sqlite3.connect("database/users.db")
-    c = conn.cursor()
-    c.execute("SELECT id FROM users WHERE email = ?", (email,))
-    result = c.fetchone()
-    conn.close()
-    return result[0] if result else None
+    profile = get_user_profile(email)
+    return profile["id"] if profile else None
+
 def get_user_language(email):
-    conn = sqlite3.connect("database/users.db")
-    c = conn.cursor()
-    c.execute("SELECT language FROM users WHERE email = ?", (email,))
-    result = c.fetchone()
-    conn.close()
-    return result[0] if result else "English"
+    profile = get_user_profile(email)
+    return profile["language"] if profile else "English"
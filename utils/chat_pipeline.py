@@ -0,0 +1,67 @@
+import logging
+import time
+
+from utils.db_ops import log_message
+from utils.intent_rules import get_intent_rules
+from utils.metrics import get_metrics, timed
+from utils.response_generator import stream_response
+from utils.translation_cache import translate
+
+logger = logging.getLogger(__name__)
+
+
+def stream_chat_turn(conversation_id, user_input, language="English", timings=None, metadata=None):
+    """
+    One chat turn, yielding the reply section by section:
+    - The user message is queued for the write-behind logger before the reply is produced,
+      so it always gets a lower id than the reply
+    - Inside the response generator, Rasa and the keyword-match fallback run in parallel
+    - The complete reply is logged once the last section has been produced, with its
+      metadata (path, matched topics, entities, timings) for the dashboard
+    Per-stage durations (ms) are written into timings if a dict is passed,
+    and the reply metadata into metadata (see get_response_with_metadata).
+    """
+    timings = {} if timings is None else timings
+    metadata = {} if metadata is None else metadata
+    start = time.perf_counter()
+
+    # log_message only enqueues; doing it here (not on a worker) keeps the question ahead of the reply
+    try:
+        log_message(conversation_id, "user", user_input)
+    except Exception as e:
+        logger.warning("Error logging user message: %s", e)
+
+    # Emergencies are recognized in the message as typed, without waiting for the input translation
+    if language == "Hindi" and get_intent_rules().classify(user_input) != "emergency":
+        with timed(timings, "input_translation"):
+            try:
+                user_input = translate(user_input, 'hi')
+            except Exception:
+                pass
+
+    sections = []
+    for section in stream_response(user_input, language, timings, metadata):
+        if not sections:
+            timings["first_section"] = round((time.perf_counter() - start) * 1000, 3)
+            get_metrics().observe("chat.first_section", timings["first_section"])
+        sections.append(section)
+        yield section
+    timings["response"] = round((time.perf_counter() - start) * 1000, 3)
+    get_metrics().observe("chat.response", timings["response"])
+    metadata["timings"] = timings
+
+    with timed(timings, "log_messages"):
+        # The logger writes later, so give it a snapshot of the metadata
+        log_message(conversation_id, "bot", "".join(sections), metadata=dict(metadata, timings=dict(timings)))
+
+    timings["total"] = round((time.perf_counter() - start) * 1000, 3)
+    get_metrics().observe("chat.total", timings["total"])
+    get_metrics().incr("chat.turns")
+    logger.debug("chat_turn conversation_id=%s path=%s timings_ms=%s", conversation_id, metadata.get("path"), timings)
+
+
+def run_chat_turn(conversation_id, user_input, language="English", metadata=None):
+    """One chat turn; returns (response, timings) with per-stage durations in ms"""
+    timings = {}
+    response = "".join(stream_chat_turn(conversation_id, user_input, language, timings, metadata))
+    return response, timings
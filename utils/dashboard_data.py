@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+
+from utils.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class SharedQueryCache:
+    """
+    Query results shared by every admin session:
+    - A result is reused for ttl seconds, then reloaded by the next reader
+    - Keys registered with refresh=True are reloaded in the background every
+      refresh_interval seconds, so dashboard renders normally never wait on SQL
+    - Beyond max_entries (e.g. many filtered pages), the oldest results are dropped
+    """
+
+    def __init__(self, ttl=60.0, refresh_interval=30.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.refresh_interval = refresh_interval
+        self._entries = {}          # key -> (loaded_at, value)
+        self._loaders = {}          # key -> loader, for background refresh
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._refresher = None
+        self.stats = {"hits": 0, "loads": 0, "background_loads": 0}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key, loader, refresh=False):
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            self.stats["hits"] += 1
+            return entry[1]
+
+        # One loader per key at a time; concurrent readers wait and reuse its result
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self.stats["hits"] += 1
+                return entry[1]
+            value = loader()
+            self._entries[key] = (time.monotonic(), value)
+            self.stats["loads"] += 1
+            if len(self._entries) > self.max_entries:
+                self._prune()
+
+        if refresh:
+            self._loaders[key] = loader
+            self._start_refresher()
+        return value
+
+    def _prune(self):
+        with self._lock:
+            oldest = sorted(self._entries, key=lambda k: self._entries[k][0])
+            for key in oldest[:len(oldest) - self.max_entries]:
+                if key not in self._loaders:
+                    self._entries.pop(key, None)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _start_refresher(self):
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="dashboard-refresh", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            for key, loader in list(self._loaders.items()):
+                try:
+                    value = loader()
+                except Exception as e:
+                    logger.warning("Dashboard refresh error for %s: %s", key, e)
+                    continue
+                self._entries[key] = (time.monotonic(), value)
+                self.stats["background_loads"] += 1
+
+
+_cache = SharedQueryCache()
+
+
+def get_dashboard_cache():
+    return _cache
+
+
+def _rows(sql, params=()):
+    cursor = get_connection().execute(sql, params)
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _page(rows, limit):
+    """Split a LIMIT limit + 1 result into (page rows, keyset cursor for the next page or None)"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (rows[-1]["id"] if has_more and rows else None)
+
+
+def get_user_page(search="", language=None, before_id=None, limit=50):
+    """One page of users, newest first, filtered in SQL; returns (rows, next_before_id)"""
+    conditions, params = [], []
+    if search:
+        conditions.append("(email LIKE ? OR name LIKE ?)")
+        params += [f"%{search}%", f"%{search}%"]
+    if language:
+        conditions.append("language = ?")
+        params.append(language)
+    if before_id is not None:
+        conditions.append("id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = _rows(f"""
+        SELECT id, email, name, language, age_group, created_at
+        FROM users {where}
+        ORDER BY id DESC
+        LIMIT ?
+    """, params + [limit + 1])
+    return _page(rows, limit)
+
+
+def get_feedback_page(rating=None, with_comments=False, before_id=None, limit=50):
+    """One page of feedback joined with the user's email, newest first; returns (rows, next_before_id)"""
+    conditions, params = [], []
+    if rating:
+        conditions.append("f.rating = ?")
+        params.append(rating)
+    if with_comments:
+        conditions.append("f.comment IS NOT NULL AND TRIM(f.comment) != ''")
+    if before_id is not None:
+        conditions.append("f.id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = _rows(f"""
+        SELECT f.id, f.rating, f.comment, f.timestamp, u.email, f.query, f.bot_response
+        FROM feedback f
+        JOIN users u ON f.user_id = u.id
+        {where}
+        ORDER BY f.id DESC
+        LIMIT ?
+    """, params + [limit + 1])
+    return _page(rows, limit)
+
@@ -0,0 +1,52 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = "database/users.db"
+
+# Applied to every new connection
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers no longer block the writer (and vice versa)
+    "PRAGMA synchronous=NORMAL",    # safe with WAL, fsyncs only at checkpoints
+    "PRAGMA busy_timeout=5000",     # wait for a lock instead of failing with "database is locked"
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Compiled statements are cached per connection, keyed by SQL text
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+
+
+def _open(db_path):
+    conn = sqlite3.connect(db_path, timeout=5.0, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_connection(db_path=DB_PATH):
+    """Return this thread's pooled connection to db_path (opened on first use)"""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = _open(db_path)
+    return conn
+
+
+@contextmanager
+def transaction(db_path=DB_PATH):
+    """Run a block of statements in one transaction on the pooled connection"""
+    conn = get_connection(db_path)
+    with conn:  # commits on success, rolls back on error
+        yield conn
+
+
+def close_connection(db_path=DB_PATH):
+    """Close this thread's pooled connection (it is reopened on next use)"""
+    connections = getattr(_local, "connections", {})
+    conn = connections.pop(db_path, None)
+    if conn is not None:
+        conn.close()
@@ -1,33 +1,50 @@
-import sqlite3
-from datetime import datetime
-
-DB_PATH = "database/users.db"
+from utils.db import DB_PATH, get_connection, transaction
+from utils.message_logger import get_message_logger
+from utils.metrics import get_metrics
 
 def start_conversation(user_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("INSERT INTO conversations (user_id) VALUES (?)", (user_id,))
-    conn.commit()
-    conv_id = c.lastrowid
-    conn.close()
-    return conv_id
+    # Timed including the wait for SQLite's write lock, which it shares with the message logger
+    with get_metrics().timer("db.start_conversation"), transaction(DB_PATH) as conn:
+        c = conn.execute("INSERT INTO conversations (user_id) VALUES (?)", (user_id,))
+    return c.lastrowid
 
-def log_message(conversation_id, sender, text, feedback=None):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO messages (conversation_id, sender, message_content, feedback) VALUES (?, ?, ?, ?)",
-        (conversation_id, sender, text, feedback)
-    )
-    conn.commit()
-    conn.close()
+def log_message(conversation_id, sender, text, feedback=None, metadata=None):
+    # Queued and written in batches by the background message logger;
+    # metadata (from get_response_with_metadata) is stored in the message_meta side tables
+    get_message_logger().log_message(conversation_id, sender, text, feedback, metadata)
 
 def store_feedback(user_id, query, bot_response, rating, comment=""):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO feedback (user_id, query, bot_response, rating, comment) VALUES (?, ?, ?, ?, ?)",
-        (user_id, query, bot_response, rating, comment)
-    )
-    conn.commit()
-    conn.close()
+    get_message_logger().store_feedback(user_id, query, bot_response, rating, comment)
+
+# Longest a history read waits for the message logger before reading what is already written
+HISTORY_FLUSH_TIMEOUT = 5.0
+
+def flush_logs(timeout=None):
+    """Wait until the messages and feedback queued so far are in the database"""
+    return get_message_logger().flush(timeout)
+
+def conversation_belongs_to(conversation_id, user_id):
+    row = get_connection().execute("SELECT user_id FROM conversations WHERE id = ?", (conversation_id,)).fetchone()
+    return row is not None and row[0] == user_id
+
+def get_message_history(conversation_id, before_id=None, limit=20):
+    """
+    One page of a conversation's history using keyset pagination on message id.
+    Returns (messages oldest first, cursor for the next older page or None at the start).
+    """
+    flush_logs(HISTORY_FLUSH_TIMEOUT)
+    if before_id is None:
+        rows = get_connection().execute(
+            "SELECT id, sender, message_content, timestamp FROM messages WHERE conversation_id = ? ORDER BY id DESC LIMIT ?",
+            (conversation_id, limit + 1)
+        ).fetchall()
+    else:
+        rows = get_connection().execute(
+            "SELECT id, sender, message_content, timestamp FROM messages WHERE conversation_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (conversation_id, before_id, limit + 1)
+        ).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    messages = [{"id": r[0], "sender": r[1], "content": r[2], "timestamp": r[3]} for r in reversed(rows)]
+    cursor = messages[0]["id"] if has_more and messages else None
+    return messages, cursor
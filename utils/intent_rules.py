@@ -0,0 +1,85 @@
+import json
+import logging
+import re
+import threading
+
+from utils.language_detector import SCRIPTS
+
+INTENT_RULES_PATH = "data/intent_rules.json"
+
+logger = logging.getLogger(__name__)
+
+# Letters of the supported scripts count as word characters, so Devanagari vowel signs don't split words
+_LETTERS = r"\w" + "".join(SCRIPTS.values())
+_WORD = re.compile(f"[{_LETTERS}]+")
+
+
+class IntentRules:
+    """
+    Short-circuit intents (greet, thank, goodbye, emergency) from data/intent_rules.json:
+    - Every phrase of every rule is compiled into one regex with word boundaries,
+      so one scan of the message finds them all ("hi" no longer matches "this" or "chest")
+    - Rules are tried in file order; the first with a match wins, emergency being first
+    - Small-talk rules only apply to short messages: at most max_other_words words
+      besides their phrases and the filler words ("hi, I have fever" is not a greeting)
+    """
+
+    def __init__(self, rules, filler_words=()):
+        self.rules = rules
+        self.filler_words = frozenset(w.lower() for w in filler_words)
+        self._rule_of = {}      # phrase -> index of its rule
+        for i, rule in enumerate(rules):
+            for phrase in rule["phrases"]:
+                self._rule_of.setdefault(" ".join(phrase.lower().split()), i)
+        # Longest phrases first, so "heavy bleeding" wins over "bleeding"; any run of whitespace between words
+        alternatives = sorted(self._rule_of, key=len, reverse=True)
+        pattern = "|".join(r"\s+".join(map(re.escape, phrase.split())) for phrase in alternatives)
+        self._pattern = re.compile(f"(?<![{_LETTERS}])(?:{pattern})(?![{_LETTERS}])") if pattern else None
+
+    @classmethod
+    def load(cls, path=INTENT_RULES_PATH):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error("Error loading intent rules from %s: %s", path, e)
+            data = {"rules": []}
+        return cls(data["rules"], data.get("filler_words", ()))
+
+    def match(self, text):
+        """The matching rule ({"intent", "reply", ...}) for a message, or None"""
+        if self._pattern is None:
+            return None
+        text = text.lower()
+        matched = {self._rule_of[" ".join(m.group().split())] for m in self._pattern.finditer(text)}
+        other_words = None
+        for i in sorted(matched):
+            rule = self.rules[i]
+            limit = rule.get("max_other_words")
+            if limit is None:
+                return rule
+            if other_words is None:
+                rest = self._pattern.sub(" ", text)
+                other_words = sum(1 for w in _WORD.findall(rest) if w not in self.filler_words)
+            if other_words <= limit:
+                return rule
+        return None
+
+    def classify(self, text):
+        """Intent name ("greet", "thank", "goodbye", "emergency") of a message, or None"""
+        rule = self.match(text)
+        return rule["intent"] if rule else None
+
+
+_rules = None
+_rules_lock = threading.Lock()
+
+
+def get_intent_rules():
+    """Process-wide rule engine, compiled once from INTENT_RULES_PATH"""
+    global _rules
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                _rules = IntentRules.load()
+    return _rules
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+from collections import namedtuple
+
+from utils.keyword_matcher import KeywordAutomaton
+from utils.metrics import get_metrics
+
+KB_PATH = "data/knowledge_base.json"
+
+# One built version of the knowledge base; replaced as a whole, never modified, so a lookup
+# that reads it once can't mix the automaton of one version with the topics of another
+KBSnapshot = namedtuple("KBSnapshot", ["topics", "topic_order", "automaton", "version"])
+
+
+class KnowledgeBaseIndex:
+    """
+    Knowledge base loaded once and kept in memory:
+    - All topic names and keywords are compiled into one automaton per file version
+    - The file is only re-read when its mtime/size changes or on invalidate()
+    - Each build is published as one KBSnapshot; readers take self.snapshot once per lookup
+    """
+
+    def __init__(self, kb_path=KB_PATH):
+        self.kb_path = kb_path
+        # topic_order: topic names in file order; version: bumped every time the index is rebuilt
+        self.snapshot = KBSnapshot({}, [], KeywordAutomaton().build(), 0)
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    @property
+    def topics(self):
+        return self.snapshot.topics
+
+    @property
+    def topic_order(self):
+        return self.snapshot.topic_order
+
+    @property
+    def automaton(self):
+        return self.snapshot.automaton
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    def _file_stamp(self):
+        stat = os.stat(self.kb_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _build(self, knowledge_base):
+        """Map every topic name and keyword to the topic's position in the file"""
+        topic_order = list(knowledge_base.keys())
+        automaton = KeywordAutomaton()
+        for position, topic in enumerate(topic_order):
+            for keyword in [topic] + knowledge_base[topic].get("keywords", []):
+                if keyword:
+                    automaton.add(keyword.lower(), position)
+        return topic_order, automaton.build()
+
+    def refresh(self):
+        """Reload the knowledge base if the file changed since the last build"""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return self
+        with self._lock:
+            if stamp == self._stamp:
+                return self
+            try:
+                with open(self.kb_path, "r", encoding="utf-8") as f:
+                    knowledge_base = json.load(f)
+                topic_order, automaton = self._build(knowledge_base)
+            except Exception:
+                # Keep serving the last good version (e.g. file caught mid-write)
+                if self._stamp is not None:
+                    return self
+                raise
+            self.snapshot = KBSnapshot(knowledge_base, topic_order, automaton, self.snapshot.version + 1)
+            self._stamp = stamp
+        return self
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup"""
+        with self._lock:
+            self._stamp = None
+
+    def match_text(self, text):
+        """Return every (topic, data) whose topic name or keywords appear in text, in file order"""
+        snapshot = self.snapshot
+        with get_metrics().timer("kb.match_text"):
+            positions = sorted(snapshot.automaton.find_values(text.lower()))
+        order = snapshot.topic_order
+        return [(order[p], snapshot.topics[order[p]]) for p in positions]
+
+    def match_symptom(self, symptom):
+        """Return the first (topic, data) matching a single symptom, or None"""
+        snapshot = self.snapshot
+        with get_metrics().timer("kb.match_symptom"):
+            positions = snapshot.automaton.find_values(symptom.lower())
+        if not positions:
+            return None
+        topic = snapshot.topic_order[min(positions)]
+        return topic, snapshot.topics[topic]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_kb_index():
+    """Process-wide knowledge base index, refreshed if the file changed"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = KnowledgeBaseIndex()
+    return _index.refresh()
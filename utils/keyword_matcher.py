@@ -0,0 +1,83 @@
+from collections import deque
+
+
+def _is_word_char(ch):
+    # Same definition of a "word" character as the re module's \w
+    return ch.isalnum() or ch == "_"
+
+
+def _is_boundary(text, pos):
+    """True where the regex \\b would match: between a word and a non-word character"""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over many keywords:
+    - Every keyword is mapped to a value (e.g. a topic index)
+    - One linear scan of the text finds all keywords, with \\b word-boundary checks
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]        # per state: list of (keyword length, value)
+        self._built = False
+
+    def add(self, keyword, value):
+        """Add a (lowercase) keyword that reports value when found"""
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(keyword), value))
+        self._built = False
+
+    def build(self):
+        """Compute failure links (breadth-first) and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def iter_matches(self, text):
+        """Yield (start, end, value) for every keyword occurrence on word boundaries"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            for length, value in out[state]:
+                start = end - length
+                if _is_boundary(text, start) and _is_boundary(text, end):
+                    yield start, end, value
+
+    def find_values(self, text):
+        """Return the set of values whose keywords occur in text"""
+        return {value for _, _, value in self.iter_matches(text)}
@@ -0,0 +1,76 @@
+import re
+
+# Unicode blocks of the Indic scripts we recognize, by the language the app treats them as
+SCRIPTS = {
+    "Hindi": "\u0900-\u097f\ua8e0-\ua8ff",    # Devanagari and Devanagari Extended
+    "Bengali": "\u0980-\u09ff",
+    "Tamil": "\u0b80-\u0bff",
+    "Telugu": "\u0c00-\u0c7f",
+}
+
+# An Indic script wins once it makes up this share of the letters in the message
+MIN_SCRIPT_RATIO = 0.3
+
+# Roman Hindi words that are not English words
+ROMAN_HINDI = frozenset("""
+    mujhe mujhko mera meri mere mein hoon hun hai hain hota hoti hote raha rahi rahe gaya gayi hua hui
+    nahi nahin nhi kya kyun kyon kaise kaisa kaisi kab kitna kitni kitne bahut bohot thoda thodi zyada jyada
+    aur lekin bhi abhi aaj kal din raat subah shaam kuch koi yeh woh wo aap hum tum apna apni ke ka ki ko ne
+    tha thi karo karna karu kar kare karta karti lagta lagti laga lagi ho haan ji theek thik accha acha achha
+    bukhar bukhaar sardi khansi khaansi jukam zukam dard sirdard sardard dast ulti chakkar kamzori thakan thakaan
+    neend pani paani khana dawai dawa ilaj sehat tabiyat tabiyet ghabrahat saans khujli jalan sujan soojan
+    haath aankh aankhen kaan naak daant kamar gardan pait sar seene seena chhati bachao madad jaldi
+""".split())
+
+# Romanized Hindi that is also English; only counts next to at least one word from ROMAN_HINDI
+ROMAN_HINDI_AMBIGUOUS = frozenset("sir main me to do se par pair pet gale man bas the jal hi".split())
+
+# Share of Latin words that must be Roman Hindi for the message to count as Hindi
+ROMAN_HINDI_RATIO = 0.3
+
+_SCRIPT_RUNS = re.compile("|".join(f"(?P<{name}>[{chars}]+)" for name, chars in SCRIPTS.items())
+                          + "|(?P<Latin>[A-Za-z]+)")
+_LATIN_WORD = re.compile("[a-z]+")
+
+
+def script_counts(text):
+    """Letters per script ("Hindi", "Bengali", "Tamil", "Telugu", "Latin") and the lowercased Latin words"""
+    counts = dict.fromkeys(list(SCRIPTS) + ["Latin"], 0)
+    words = []
+    for run in _SCRIPT_RUNS.finditer(text):
+        script = run.lastgroup
+        counts[script] += run.end() - run.start()
+        if script == "Latin":
+            words.append(run.group().lower())
+    return counts, words
+
+
+def is_roman_hindi(words):
+    """Whether enough of the Latin words are Roman Hindi, with at least one unambiguous one"""
+    if not words:
+        return False
+    hindi = sum(map(ROMAN_HINDI.__contains__, words))
+    if not hindi:
+        return False
+    ambiguous = sum(map(ROMAN_HINDI_AMBIGUOUS.__contains__, words))
+    return (hindi + ambiguous) / len(words) >= ROMAN_HINDI_RATIO
+
+
+def detect_language(text):
+    """
+    Language of a chat message: "Hindi", "Bengali", "Tamil", "Telugu" or "English".
+    - Script ratio: the Indic script with the most letters wins if it reaches MIN_SCRIPT_RATIO
+    - Otherwise Latin text is Hindi when its words are Roman Hindi (whole tokens, so
+      "chair" and "desire" no longer count as "hai" and "sir")
+    """
+    if text.isascii():
+        # Most messages: no Indic letters to count, only Roman Hindi to look for
+        return "Hindi" if is_roman_hindi(_LATIN_WORD.findall(text.lower())) else "English"
+    counts, words = script_counts(text)
+    total = sum(counts.values())
+    if not total:
+        return "English"
+    script = max(SCRIPTS, key=counts.get)
+    if counts[script] / total >= MIN_SCRIPT_RATIO:
+        return script
+    return "Hindi" if is_roman_hindi(words) else "English"
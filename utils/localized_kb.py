@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from utils.translation_cache import get_translation_cache, translate
+
+TRANSLATIONS_DIR = "data/translations"
+
+logger = logging.getLogger(__name__)
+
+# Reply languages other than English, with their translator codes
+SUPPORTED_LANGUAGES = {"Hindi": "hi"}
+
+# Fixed system strings used to assemble replies (English source text)
+RESPONSE_STRINGS = {
+    "greeting": "Hello! 👋 How can I help you with your health today?",
+    "emergency": "🚨 **Emergency!** Please contact 112/108 or visit the nearest hospital immediately.",
+    "thanks": "You're welcome! 😊 Take care and let me know if you need anything else.",
+    "goodbye": "Goodbye! Stay healthy and take care of yourself! 💙",
+    "advice": "Advice",
+    "prevention": "Prevention",
+    "found_many": "I found {count} health concerns:",
+    "found_one": "I found this health concern:",
+    "consult_for_symptom": "For '{symptom}', I recommend consulting a healthcare professional for proper diagnosis.",
+    "describe_more": "I understand you're not feeling well. Could you describe your symptoms in more detail?",
+    "ask_symptoms": "I'm here to help! Could you describe your symptoms a bit more?",
+    "kb_unavailable": "Unable to load health information. Please try again later.",
+    "disclaimer_label": "Disclaimer",
+    "disclaimer": "This information is for educational purposes only. Please consult a healthcare professional.",
+}
+
+TOPIC_FIELDS = ("title", "description", "remedy", "prevention")
+
+
+def content_hash(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def topic_source(topic, data):
+    """English text of every translatable field of a KB topic"""
+    return {
+        "title": topic.title(),
+        "description": data.get("description", ""),
+        "remedy": data.get("remedy", ""),
+        "prevention": data.get("prevention", ""),
+    }
+
+
+def placeholders(text):
+    return sorted(re.findall(r"\{\w+\}", text))
+
+
+def catalog_path(code):
+    return os.path.join(TRANSLATIONS_DIR, f"kb_{code}.json")
+
+
+class Localizer:
+    """
+    Assembles reply text in one language:
+    - English returns the source strings and KB fields unchanged
+    - Other languages read the pre-translated catalog built by build_translations.py,
+      and only fall back to the (cached) translator for entries that are missing or stale
+    """
+
+    def __init__(self, code=None, catalog=None):
+        self.code = code
+        self.catalog = catalog or {"strings": {}, "topics": {}}
+
+    def _translate(self, text):
+        try:
+            return translate(text, self.code)
+        except Exception:
+            return text
+
+    def string(self, key, **values):
+        source = RESPONSE_STRINGS[key]
+        if self.code is None:
+            return source.format(**values)
+        entry = self.catalog["strings"].get(key)
+        if entry and entry["hash"] == content_hash(source):
+            try:
+                return entry["text"].format(**values)
+            except (KeyError, IndexError, ValueError):
+                pass
+        return self._translate(source.format(**values))
+
+    def cached_string(self, key):
+        """string() that never waits for the translator: English if no translation is at hand"""
+        source = RESPONSE_STRINGS[key]
+        if self.code is None:
+            return source
+        entry = self.catalog["strings"].get(key)
+        if entry and entry["hash"] == content_hash(source):
+            return entry["text"]
+        try:
+            return get_translation_cache().cached(source, self.code) or source
+        except Exception:
+            return source
+
+    def topic(self, topic, data):
+        source = topic_source(topic, data)
+        if self.code is None:
+            return source
+        entry = self.catalog["topics"].get(topic)
+        if entry and entry["hash"] == content_hash(source):
+            return entry["fields"]
+        return {field: self._translate(text) if text else text for field, text in source.items()}
+
+
+_english = Localizer()
+_localizers = {}
+_lock = threading.Lock()
+
+
+def get_localizer(language):
+    """Localizer for a reply language name ("English", "Hindi"), reloaded when its catalog changes"""
+    code = SUPPORTED_LANGUAGES.get(language)
+    if code is None:
+        return _english
+
+    path = catalog_path(code)
+    try:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+
+    cached = _localizers.get(code)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    with _lock:
+        catalog = None
+        if stamp is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    catalog = json.load(f)
+            except Exception as e:
+                logger.warning("Could not load translation catalog %s: %s", path, e)
+        localizer = Localizer(code, catalog)
+        _localizers[code] = (stamp, localizer)
+    return localizer
@@ -0,0 +1,214 @@
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from utils.db import DB_PATH, transaction
+from utils.message_meta import record_message_meta
+from utils.metrics import get_metrics
+from utils.rollups import record_feedback, record_messages
+
+INSERT_MESSAGE = "INSERT INTO messages (conversation_id, sender, message_content, feedback, timestamp) VALUES (?, ?, ?, ?, ?)"
+INSERT_FEEDBACK = "INSERT INTO feedback (user_id, query, bot_response, rating, comment, timestamp) VALUES (?, ?, ?, ?, ?, ?)"
+
+logger = logging.getLogger(__name__)
+
+
+def _is_lock_error(error):
+    # "database is locked" / "database is busy" once busy_timeout ran out: worth another try
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in str(error) or "busy" in str(error))
+
+
+def _now():
+    # Same format as SQLite's CURRENT_TIMESTAMP, captured when the event happens
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class MessageLogger:
+    """
+    Write-behind logger for chat messages and feedback:
+    - Callers only enqueue a row; a background thread does the INSERTs
+    - Rows are flushed with executemany in one transaction every batch_size rows or flush_interval_ms
+    - The dashboard rollup tables and reply metadata are written in the same transaction
+    - The queue is bounded: when full, callers wait up to put_timeout, then write the row themselves
+    - A batch that hits a lock/busy error is retried max_retries times with backoff; a batch that
+      fails otherwise is written one row at a time, so one bad row doesn't lose the others
+    """
+
+    def __init__(self, db_path=DB_PATH, batch_size=50, flush_interval_ms=200, max_queue=10000, put_timeout=0.05,
+                 max_retries=3, retry_delay_ms=100):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "direct_writes": 0, "errors": 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="message-logger", daemon=True)
+                self._thread.start()
+        return self
+
+    def log_message(self, conversation_id, sender, text, feedback=None, metadata=None):
+        self._enqueue(("message", (conversation_id, sender, text, feedback, _now()), metadata))
+
+    def store_feedback(self, user_id, query, bot_response, rating, comment=""):
+        self._enqueue(("feedback", (user_id, query, bot_response, rating, comment, _now()), None))
+
+    def _enqueue(self, item):
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put(item, timeout=self.put_timeout)
+            self.stats["queued"] += 1
+        except queue.Full:
+            # Backpressure: the writer is behind, so this caller writes its own row
+            self.stats["direct_writes"] += 1
+            self._write_batch([item], raise_errors=True)
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            # A flush marker ends the batch at once: someone is waiting for these rows
+            while len(batch) < self.batch_size and batch[-1][0] != "flush":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            rows = [item for item in batch if item[0] != "flush"]
+            try:
+                if rows:
+                    self._write_batch(rows)
+            finally:
+                for kind, done, _ in batch:
+                    if kind == "flush":
+                        done.set()
+                    self._queue.task_done()
+
+    def _write_batch(self, batch, raise_errors=False):
+        """
+        Write a batch, retrying lock errors; fall back to one row per transaction.
+        Rows that can't be written are logged and counted; with raise_errors the
+        last error is raised to the caller (a caller writing its own row).
+        """
+        error = self._write_with_retries(batch, self.max_retries)
+        if error is None:
+            return
+        failed = []
+        if len(batch) > 1 and not _is_lock_error(error):
+            logger.warning("Writing a batch of %d rows failed (%s), writing them one at a time", len(batch), error)
+            for item in batch:
+                item_error = self._write_with_retries([item], 0)
+                if item_error is not None:
+                    failed.append(item)
+                    error = item_error
+        else:
+            failed = batch
+        if not failed:
+            return
+        self.stats["errors"] += len(failed)
+        get_metrics().incr("db.write_errors", len(failed))
+        for kind, row, _ in failed:
+            logger.error("Message logger dropped a %s row (%s, %s): %s", kind, row[0], row[1], error)
+        if raise_errors:
+            raise error
+
+    def _write_with_retries(self, batch, retries):
+        """Write batch in one transaction; returns None on success, else the last error"""
+        for attempt in range(retries + 1):
+            try:
+                self._write(batch)
+                return None
+            except Exception as e:
+                if not _is_lock_error(e):
+                    return e
+                error = e
+                if attempt < retries:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+        return error
+
+    def _write(self, batch):
+        messages = [(row, metadata) for kind, row, metadata in batch if kind == "message"]
+        feedback = [row for kind, row, _ in batch if kind == "feedback"]
+        with get_metrics().timer("db.write_batch"), transaction(self.db_path) as conn:
+            if messages:
+                self._insert_messages(conn, messages)
+                record_messages(conn, [row for row, _ in messages])
+            if feedback:
+                conn.executemany(INSERT_FEEDBACK, feedback)
+                record_feedback(conn, feedback)
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        get_metrics().incr("db.rows_written", len(batch))
+
+    def _insert_messages(self, conn, messages):
+        """
+        Insert messages in queue order (ids must follow the conversation).
+        Runs without metadata go through executemany; a message with metadata
+        is inserted on its own so its id can key the metadata rows.
+        """
+        run = []
+        for row, metadata in messages:
+            if metadata is None:
+                run.append(row)
+                continue
+            if run:
+                conn.executemany(INSERT_MESSAGE, run)
+                run = []
+            message_id = conn.execute(INSERT_MESSAGE, row).lastrowid
+            record_message_meta(conn, message_id, metadata)
+        if run:
+            conn.executemany(INSERT_MESSAGE, run)
+
+    def flush(self, timeout=None):
+        """
+        Block until every row queued before this call has been written (or timeout seconds).
+        Waits for a marker put behind those rows, so other sessions' later writes don't delay it.
+        Returns False on timeout.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(("flush", done, None))
+        return done.wait(timeout)
+
+    def close(self):
+        """Flush remaining rows and stop the background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_message_logger():
+    """Process-wide message logger, started on first use and flushed at exit"""
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = MessageLogger().start()
+                atexit.register(_logger.close)
+    return _logger
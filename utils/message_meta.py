@@ -0,0 +1,67 @@
+# How a bot reply was produced; stored as the index into this tuple, so only append
+PATHS = ("greeting", "emergency", "local", "rasa", "fallback", "thanks", "goodbye")
+
+# Compact per-message side tables, keyed by integers, behind the topic and latency charts
+CREATE_META_TABLES = [
+    '''CREATE TABLE IF NOT EXISTS kb_topics (
+           id INTEGER PRIMARY KEY,
+           name TEXT UNIQUE NOT NULL
+       )''',
+    '''CREATE TABLE IF NOT EXISTS message_meta (
+           message_id INTEGER PRIMARY KEY,
+           path INTEGER NOT NULL,
+           cached INTEGER NOT NULL DEFAULT 0,
+           latency_ms INTEGER,
+           rasa_ms INTEGER,
+           entities TEXT
+       )''',
+    '''CREATE TABLE IF NOT EXISTS message_topics (
+           message_id INTEGER NOT NULL,
+           topic_id INTEGER NOT NULL,
+           PRIMARY KEY (message_id, topic_id)
+       ) WITHOUT ROWID''',
+    "CREATE INDEX IF NOT EXISTS idx_message_topics_topic ON message_topics (topic_id)",
+    '''CREATE TABLE IF NOT EXISTS topic_counts (
+           topic_id INTEGER PRIMARY KEY,
+           count INTEGER NOT NULL DEFAULT 0
+       )''',
+]
+
+INSERT_META = "INSERT INTO message_meta (message_id, path, cached, latency_ms, rasa_ms, entities) VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_TOPIC = "INSERT OR IGNORE INTO message_topics (message_id, topic_id) VALUES (?, ?)"
+UPSERT_TOPIC_COUNT = '''INSERT INTO topic_counts (topic_id, count) VALUES (?, 1)
+                        ON CONFLICT(topic_id) DO UPDATE SET count = count + 1'''
+
+
+def _ms(value):
+    return None if value is None else int(round(value))
+
+
+def topic_id(conn, name):
+    """Integer id of a knowledge base topic, added to kb_topics on first use"""
+    conn.execute("INSERT OR IGNORE INTO kb_topics (name) VALUES (?)", (name,))
+    return conn.execute("SELECT id FROM kb_topics WHERE name = ?", (name,)).fetchone()[0]
+
+
+def record_message_meta(conn, message_id, metadata):
+    """
+    Store a bot reply's metadata (from get_response_with_metadata) for message_id.
+    Only the compact parts are kept: path code, cache flag, reply and Rasa latency,
+    symptom values, and one row per matched topic.
+    """
+    if metadata.get("path") not in PATHS:
+        return
+    timings = metadata.get("timings", {})
+    entities = ",".join(e["value"] for e in metadata.get("entities", []) if e.get("entity") == "symptom")
+    conn.execute(INSERT_META, (
+        message_id,
+        PATHS.index(metadata["path"]),
+        1 if metadata.get("cached") else 0,
+        _ms(timings.get("response")),
+        _ms(timings.get("rasa")),
+        entities or None,
+    ))
+    for name in dict.fromkeys(metadata.get("topics", [])):
+        tid = topic_id(conn, name)
+        conn.execute(INSERT_TOPIC, (message_id, tid))
+        conn.execute(UPSERT_TOPIC_COUNT, (tid,))
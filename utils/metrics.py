@@ -0,0 +1,137 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Level of the app's loggers ("utils.*"); DEBUG shows per-turn details
+LOG_LEVEL = os.getenv("WELLBOT_LOG_LEVEL", "WARNING")
+
+
+def configure_logging(level=None):
+    """Send the app's log records to stderr at LOG_LEVEL (records below it are dropped before formatting)"""
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger("utils").setLevel((level or LOG_LEVEL).upper())
+
+
+class Timer:
+    """
+    Durations (ms) of one operation:
+    - count, total and max over the process lifetime
+    - p50/p95/p99 over the most recent window samples
+    """
+
+    def __init__(self, window=2048):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        self.samples.append(ms)
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def summary(self):
+        ordered = sorted(self.samples)
+
+        def percentile(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3) if ordered else 0.0
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(self.max, 3),
+        }
+
+
+class Metrics:
+    """Process-wide timers and counters, keyed by dotted names like "chat.rasa" or "db.rows_written\""""
+
+    def __init__(self, window=2048):
+        self.window = window
+        self._timers = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, ms):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = Timer(self.window)
+            timer.observe(ms)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "timers": {name: timer.summary() for name, timer in sorted(self._timers.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    return _metrics
+
+
+@contextmanager
+def timed(timings, stage):
+    """
+    Record how long a block took, in milliseconds, under timings[stage]
+    and in the process-wide "chat.<stage>" timer
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        _metrics.observe(f"chat.{stage}", ms)
+        if timings is not None:
+            timings[stage] = round(ms, 3)
+
+
+def cache_report():
+    """Hit rates and counters of the caches, NLU client and message logger in this process"""
+    from utils.message_logger import get_message_logger
+    from utils.nlu_client import get_nlu_client
+    from utils.response_cache import get_response_cache
+    from utils.translation_cache import get_translation_cache
+
+    response_cache = get_response_cache()
+    translation_cache = get_translation_cache()
+    return {
+        "response_cache": dict(response_cache.stats, hit_rate=round(response_cache.hit_rate(), 3), size=len(response_cache)),
+        "translation_cache": dict(translation_cache.stats, hit_rate=round(translation_cache.hit_rate(), 3)),
+        "nlu_client": dict(get_nlu_client().stats),
+        "message_logger": dict(get_message_logger().stats),
+    }
+
+
+def metrics_report():
+    """Everything the /metrics endpoint and the admin Performance tab show"""
+    return dict(get_metrics().snapshot(), caches=cache_report())
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+RASA_URL = os.environ.get("RASA_URL", "http://localhost:5005")
+
+# "http" talks to `rasa run --enable-api`; "inprocess" loads the trained model into this process
+NLU_MODE = os.environ.get("WELLBOT_NLU_MODE", "http")
+RASA_MODEL_PATH = os.environ.get("RASA_MODEL_PATH", "y/models")
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service for a while:
+    - closed: calls go through; failure_threshold consecutive failures open the circuit
+    - open: calls are refused until cooldown seconds have passed
+    - half-open: one trial call decides whether to close or re-open
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class RasaNLUClient:
+    """
+    HTTP client for the Rasa /model/parse endpoint:
+    - Keep-alive connections from a shared pool instead of a new connection per message
+      (requests is imported and the pool created on the first call, not at app start)
+    - Each call is bounded by timeout_budget seconds
+    - A circuit breaker skips Rasa entirely while it keeps failing
+    """
+
+    def __init__(self, base_url=RASA_URL, timeout_budget=1.0, connect_timeout=0.25,
+                 pool_size=16, failure_threshold=3, cooldown=30.0):
+        self.parse_url = base_url.rstrip("/") + "/model/parse"
+        self.timeout_budget = timeout_budget
+        self.connect_timeout = min(connect_timeout, timeout_budget)
+        self.breaker = CircuitBreaker(failure_threshold, cooldown)
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "short_circuited": 0}
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def parse(self, text):
+        """Return Rasa's parse result for text, or None if Rasa is unavailable"""
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            return None
+        self.stats["calls"] += 1
+        try:
+            response = self.session.post(
+                self.parse_url,
+                json={"text": text},
+                timeout=(self.connect_timeout, self.timeout_budget),
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            self.stats["failures"] += 1
+            self.breaker.record_failure()
+            logger.warning("Rasa entity extraction error: %s", e)
+            return None
+        self.breaker.record_success()
+        return data
+
+    def get_entities(self, text):
+        data = self.parse(text)
+        return data.get("entities", []) if data else []
+
+
+class InProcessNLUClient:
+    """
+    Runs the model trained from y/config.yml inside this process:
+    - The model is loaded once and shared by every session
+    - Parsing runs on a dedicated event loop thread, bounded by timeout_budget
+    Requires the optional `rasa` package and a trained model (`rasa train` in y/).
+    """
+
+    def __init__(self, model_path=RASA_MODEL_PATH, timeout_budget=1.0):
+        from rasa.core.agent import Agent
+        from rasa.model import get_latest_model
+
+        model = get_latest_model(model_path) if os.path.isdir(model_path) else model_path
+        if not model:
+            raise FileNotFoundError(f"No trained Rasa model found in {model_path}")
+        self.agent = Agent.load(model)
+        self.timeout_budget = timeout_budget
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="rasa-inprocess", daemon=True).start()
+        self.stats = {"calls": 0, "failures": 0}
+
+    def parse(self, text):
+        """Return the model's parse result for text, or None on error/timeout"""
+        self.stats["calls"] += 1
+        future = asyncio.run_coroutine_threadsafe(self.agent.parse_message(text), self._loop)
+        try:
+            return future.result(timeout=self.timeout_budget)
+        except Exception as e:
+            future.cancel()
+            self.stats["failures"] += 1
+            logger.warning("Rasa entity extraction error: %s", e)
+            return None
+
+    def get_entities(self, text):
+        data = self.parse(text)
+        return data.get("entities", []) if data else []
+
+
+def create_nlu_client(mode=NLU_MODE):
+    """Build the NLU client for mode, falling back to HTTP if the model can't be loaded"""
+    if mode == "inprocess":
+        try:
+            return InProcessNLUClient()
+        except Exception as e:
+            logger.warning("In-process NLU unavailable (%s), using Rasa HTTP API", e)
+    return RasaNLUClient()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_nlu_client():
+    """Process-wide NLU client shared by every chat session"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_nlu_client()
+    return _client
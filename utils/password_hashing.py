@@ -0,0 +1,76 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+
+import bcrypt
+
+# bcrypt cost factor for new hashes (existing hashes keep the cost they were made with)
+BCRYPT_ROUNDS = int(os.environ.get("WELLBOT_BCRYPT_ROUNDS", "12"))
+
+# Processes doing bcrypt work, and how many hashes may be queued per process before callers wait
+HASH_WORKERS = int(os.environ.get("WELLBOT_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_PENDING_PER_WORKER = 4
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds))
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password.encode("utf-8"), hashed)
+
+
+class HashPool:
+    """
+    Runs bcrypt in a bounded pool of worker processes:
+    - request threads (Streamlit scripts, API workers) only wait for the result
+    - at most workers * MAX_PENDING_PER_WORKER hashes are in flight; further callers block
+    - workers=0 (WELLBOT_HASH_WORKERS=0) hashes in the calling thread, MAX_PENDING_PER_WORKER at a time
+    - if the worker processes can't be started or die, hashing falls back to the calling thread
+    """
+
+    def __init__(self, workers=HASH_WORKERS):
+        if workers < 0:
+            raise ValueError(f"WELLBOT_HASH_WORKERS must be 0 or more, got {workers}")
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(1, workers) * MAX_PENDING_PER_WORKER)
+        self._executor = None
+        self._inline = workers < 1
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: forking a process that already runs server threads is unsafe
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                         mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def run(self, fn, *args):
+        with self._slots:
+            if self._inline:
+                return fn(*args)
+            try:
+                return self._get_executor().submit(fn, *args).result()
+            except (OSError, BrokenExecutor) as e:
+                with self._lock:
+                    if not self._inline:
+                        logger.warning("bcrypt worker pool unavailable, hashing in request threads: %s", e)
+                        self._inline = True
+                return fn(*args)
+
+
+_pool = HashPool()
+
+
+def hash_password(password, rounds=None):
+    return _pool.run(_hash, password, rounds or BCRYPT_ROUNDS)
+
+
+def check_password(password, hashed):
+    return _pool.run(_check, password, hashed)
@@ -0,0 +1,68 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_SPACES = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?,;:]+$")
+
+
+def normalize_input(text):
+    """Cache key form of a message: lowercase, single spaces, no trailing punctuation"""
+    return _TRAILING_PUNCTUATION.sub("", _SPACES.sub(" ", text.strip().lower()))
+
+
+class ResponseCache:
+    """
+    Bounded cache of finished chat replies:
+    - Least recently used entries are evicted beyond max_entries
+    - Entries expire ttl seconds after they were stored
+    """
+
+    def __init__(self, max_entries=5000, ttl=600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key, response):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = ResponseCache()
+
+
+def get_response_cache():
+    return _cache
@@ -1,189 +1,284 @@
-import json
-import re
-import requests
-from deep_translator import GoogleTranslator
+import logging
+from utils.intent_rules import get_intent_rules
+from utils.kb_index import get_kb_index
+from utils.language_detector import detect_language
+from utils.nlu_client import get_nlu_client
+from utils.translation_cache import translate
+from utils.localized_kb import get_localizer
+from utils.metrics import get_metrics, timed
+from utils.response_cache import get_response_cache, normalize_input
+from utils.symptom_extractor import CONFIDENCE_THRESHOLD as SYMPTOM_CONFIDENCE_THRESHOLD, extract_symptoms
+from utils.workers import get_executor
 
-# Initialize translators
-translator_hi = GoogleTranslator(source='auto', target='hi')
-translator_en = GoogleTranslator(source='auto', target='en')
+logger = logging.getLogger(__name__)
 
 def get_rasa_entities(message):
-    """Get entities from Rasa NLU"""
-    try:
-        response = requests.post(
-            'http://localhost:5005/model/parse',
-            json={"text": message},
-            timeout=5
-        )
-        if response.status_code == 200:
-            data = response.json()
-            print(f"DEBUG: Rasa entities: {data.get('entities', [])}")
-            return data.get('entities', [])
-        return []
-    except Exception as e:
-        print(f"Rasa entity extraction error: {e}")
-        return []
+    """Get entities from Rasa NLU (empty list when Rasa is slow, down or circuit-broken)"""
+    entities = get_nlu_client().get_entities(message)
+    logger.debug("rasa_entities count=%d entities=%s", len(entities), entities)
+    return entities
 
-def process_detected_symptoms(symptoms, original_input):
-    """Process symptoms extracted by Rasa"""
+def format_topic(topic, data, localizer, spacing="\n"):
+    """Format one knowledge base topic as a reply block"""
+    fields = localizer.topic(topic, data)
+
+    response = f"🩺 **{fields['title']}**\n{fields['description']}\n\n"
+    response += f"💡 **{localizer.string('advice')}:** {fields['remedy']}\n{spacing}"
+
+    if fields["prevention"]:
+        response += f"🛡️ **{localizer.string('prevention')}:** {fields['prevention']}\n{spacing}"
+
+    return response
+
+def disclaimer(localizer):
+    return f"\n\n⚠️ **{localizer.string('disclaimer_label')}:** {localizer.string('disclaimer')}"
+
+def iter_detected_symptom_sections(symptoms, original_input, language="English", topics=None):
+    """
+    Reply to symptoms extracted from the message, yielded section by section.
+    Names of the matched knowledge base topics are appended to topics if a list is passed.
+    """
+    localizer = get_localizer(language)
     try:
-        with open("data/knowledge_base.json", "r", encoding="utf-8") as f:
-            knowledge_base = json.load(f)
+        kb_index = get_kb_index()
     except Exception as e:
-        return f"⚠️ Unable to load health information. Error: {e}"
+        yield f"⚠️ Unable to load health information. Error: {e}"
+        return
 
-    responses = []
-    matched_symptoms = []
-    
-    # Process each symptom found by Rasa
+    # First topic whose name or keywords match each symptom; symptoms naming the same
+    # topic ("fever", "high temperature") share one section
+    concerns = {}
     for symptom in symptoms:
-        symptom_lower = symptom.lower()
-        matched = False
-        
-        for topic, data in knowledge_base.items():
-            keywords = [topic] + data.get("keywords", [])
-            # Check if any keyword matches the symptom
-            if any(re.search(r'\b' + re.escape(keyword) + r'\b', symptom_lower) for keyword in keywords if keyword):
-                desc = data.get("description", "")
-                remedy = data.get("remedy", "")
-                prevention = data.get("prevention", "")
-                
-                response = f"🩺 **{topic.title()}**\n{desc}\n\n"
-                response += f"💡 **Advice:** {remedy}\n"
-                
-                if prevention:
-                    response += f"🛡️ **Prevention:** {prevention}\n"
-                
-                responses.append(response)
-                matched_symptoms.append(topic)
-                matched = True
-                break
-        
-        if not matched:
-            responses.append(f"ℹ️ For '{symptom}', I recommend consulting a healthcare professional for proper diagnosis.")
-
-    # Combine all responses
-    if responses:
-        if len(responses) > 1:
-            final_response = f"🔍 **I found {len(responses)} health concerns:**\n\n" + "\n---\n".join(responses)
+        match = kb_index.match_symptom(symptom)
+        concerns.setdefault(match[0] if match else symptom.lower(), (symptom, match))
+
+    if not concerns:
+        yield localizer.string("describe_more")
+    elif len(concerns) > 1:
+        yield f"🔍 **{localizer.string('found_many', count=len(concerns))}**\n\n"
+
+    # One section per distinct topic or unmatched symptom
+    for i, (symptom, match) in enumerate(concerns.values()):
+        if match:
+            topic, data = match
+            if topics is not None:
+                topics.append(topic)
+            section = format_topic(topic, data, localizer, spacing="")
         else:
-            final_response = responses[0]
-    else:
-        final_response = "I understand you're not feeling well. Could you describe your symptoms in more detail?"
+            section = f"ℹ️ {localizer.string('consult_for_symptom', symptom=symptom)}"
+        yield section if i == 0 else "\n---\n" + section
 
     # Add disclaimer
-    final_response += "\n\n⚠️ **Disclaimer:** This information is for educational purposes only. Please consult a healthcare professional."
+    yield disclaimer(localizer)
 
-    return final_response
+def process_detected_symptoms(symptoms, original_input, language="English"):
+    """Process symptoms extracted by Rasa"""
+    return "".join(iter_detected_symptom_sections(symptoms, original_input, language))
 
-def process_with_knowledge_base(original_input):
-    """Fallback: Direct knowledge base matching"""
-    try:
-        translated_input = translator_en.translate(original_input)
-        user_input = translated_input.lower()
-    except:
+def iter_knowledge_base_sections(original_input, language="English", topics=None, input_language=None):
+    """
+    Fallback reply from direct knowledge base matching, yielded section by section.
+    Names of the matched knowledge base topics are appended to topics if a list is passed.
+    Messages whose input_language is already known to be English are matched without the translator.
+    """
+    localizer = get_localizer(language)
+    if input_language == "English":
         user_input = original_input.lower()
+    else:
+        try:
+            translated_input = translate(original_input, 'en')
+            user_input = translated_input.lower()
+        except:
+            user_input = original_input.lower()
 
     # Knowledge base matching
-    kb_response = ""
     try:
-        with open("data/knowledge_base.json", "r", encoding="utf-8") as f:
-            knowledge_base = json.load(f)
-
-        matches = []
-        for topic, data in knowledge_base.items():
-            keywords = [topic] + data.get("keywords", [])
-            pattern = r'\b(' + '|'.join(re.escape(k) for k in keywords) + r')\b'
-            if re.search(pattern, user_input, re.IGNORECASE):
-                matches.append((topic, data))
-
-        # Build response
-        if matches:
-            matched_topics = []
-            for topic, data in matches:
-                desc = data.get("description", "")
-                remedy = data.get("remedy", "")
-                prevention = data.get("prevention", "")
-                
-                topic_response = f"🩺 **{topic.title()}**\n{desc}\n\n"
-                topic_response += f"💡 **Advice:** {remedy}\n\n"
-                
-                if prevention:
-                    topic_response += f"🛡️ **Prevention:** {prevention}\n\n"
-                
-                matched_topics.append(topic_response)
-
-            kb_response = "\n".join(matched_topics)
-            
-            if len(matches) > 1:
-                kb_response = f"🔍 **I found {len(matches)} health concerns:**\n\n" + kb_response
-            else:
-                kb_response = f"🔍 **I found this health concern:**\n\n" + kb_response
+        matches = get_kb_index().match_text(user_input)
+    except Exception:
+        yield f"⚠️ {localizer.string('kb_unavailable')}"
+        yield disclaimer(localizer)
+        return
 
-    except Exception as e:
-        kb_response = "⚠️ Unable to load health information. Please try again later."
+    if not matches:
+        yield localizer.string("ask_symptoms")
+        yield disclaimer(localizer)
+        return
+
+    if topics is not None:
+        topics.extend(topic for topic, _ in matches)
+
+    if len(matches) > 1:
+        yield f"🔍 **{localizer.string('found_many', count=len(matches))}**\n\n"
+    else:
+        yield f"🔍 **{localizer.string('found_one')}**\n\n"
+
+    # One section per matched topic
+    for i, (topic, data) in enumerate(matches):
+        section = format_topic(topic, data, localizer)
+        if i > 0:
+            section = "\n" + section
+        if i == len(matches) - 1:
+            section = section.rstrip()
+        yield section
+
+    yield disclaimer(localizer)
 
-    if not kb_response.strip():
-        kb_response = "I'm here to help! Could you describe your symptoms a bit more?"
+def process_with_knowledge_base(original_input, language="English"):
+    """Fallback: Direct knowledge base matching"""
+    return "".join(iter_knowledge_base_sections(original_input, language))
+
+_cached_kb_version = None
+
+def response_cache_key(user_input, target_language):
+    """
+    Response cache key: normalized message, target language and knowledge base version.
+    Editing the knowledge base bumps its version, which also empties the cache.
+    Returns None when the knowledge base can't be loaded (nothing is cached then).
+    """
+    global _cached_kb_version
+    try:
+        kb_version = get_kb_index().version
+    except Exception:
+        return None
+    if kb_version != _cached_kb_version:
+        get_response_cache().clear()
+        _cached_kb_version = kb_version
+    return (normalize_input(user_input), target_language, kb_version)
+
+def stream_response(user_input, target_language="English", timings=None, metadata=None):
+    """
+    Streaming get_response: yields the reply section by section
+    (short-circuit reply, or header, one block per topic, disclaimer).
+    Cached replies come back as a single section; new ones are cached once complete.
+    Pass a dict as metadata to collect how the reply was produced (see iter_response),
+    plus metadata["cached"].
+    """
+    metadata = {} if metadata is None else metadata
+    cache = get_response_cache()
+    key = response_cache_key(user_input, target_language)
 
-    disclaimer = "\n\n⚠️ **Disclaimer:** This information is for educational purposes only. Please consult a healthcare professional."
-    return kb_response.strip() + disclaimer
+    if key is not None:
+        with timed(timings, "response_cache"):
+            cached = cache.get(key)
+        if cached is not None:
+            response, cached_metadata = cached
+            metadata.update(cached_metadata, cached=True)
+            get_metrics().incr(f"chat.path.{metadata['path']}")
+            yield response
+            return
 
-def detect_language(text):
-    """Detect if text is Hindi or English"""
-    def contains_hindi(text):
-        return any('\u0900' <= ch <= '\u097f' for ch in text)
+    sections = []
+    for section in iter_response(user_input, target_language, timings, metadata):
+        sections.append(section)
+        yield section
+    metadata["cached"] = False
+    get_metrics().incr(f"chat.path.{metadata['path']}")
 
-    def is_roman_hindi(text):
-        roman_words = ["mujhe", "bukhar", "sardi", "sir", "dard", "thoda", "hai", "nahi", "jal", "pani", "thakan"]
-        return any(word in text.lower() for word in roman_words)
+    if key is not None:
+        cache.put(key, ("".join(sections), {k: metadata[k] for k in ("path", "topics", "entities")}))
 
-    return "Hindi" if contains_hindi(text) or is_roman_hindi(text) else "English"
+def get_response(user_input, target_language="English", timings=None):
+    """
+    Cached chat reply (see stream_response).
+    Pass a dict as timings to collect per-stage durations (ms).
+    """
+    return "".join(stream_response(user_input, target_language, timings))
 
-def get_response(user_input, target_language="English"):
+def get_response_with_metadata(user_input, target_language="English"):
+    """
+    Cached chat reply and how it was produced, as (response, metadata):
+    - path: "greeting", "thanks", "goodbye", "emergency", "local", "rasa" or "fallback"
+    - topics: names of the knowledge base topics in the reply
+    - entities: symptom entities ({"entity", "value"}) from the local extractor or Rasa
+    - cached: whether the reply came from the response cache
+    - timings: per-stage durations (ms), "response" being the whole reply
+    """
+    timings = {}
+    metadata = {"timings": timings}
+    with timed(timings, "response"):
+        response = "".join(stream_response(user_input, target_language, timings, metadata))
+    return response, metadata
+
+def generate_response(user_input, target_language="English", timings=None):
+    """Uncached chat reply"""
+    return "".join(iter_response(user_input, target_language, timings))
+
+def iter_response(user_input, target_language="English", timings=None, metadata=None):
     """
     Smart Health Chatbot:
-    - Uses Rasa for intelligent entity extraction
+    - Extracts symptoms locally, using Rasa when the local extractor is unsure
     - Falls back to keyword matching if Rasa fails
     - Supports multilingual responses
+    Yields the reply one section at a time.
+    Fills metadata (if a dict is passed) with the path taken, matched topics and entities.
     """
 
+    metadata = {} if metadata is None else metadata
+    metadata.update(path=None, topics=[], entities=[])
     original_input = user_input.strip()
 
     # Language detection
-    detected_language = detect_language(original_input)
-
-    # Greetings
-    greetings = ["hi", "hello", "hey", "namaste", "नमस्ते"]
-    if any(word in original_input.lower() for word in greetings):
-        response = "Hello! 👋 How can I help you with your health today?"
-        return translator_hi.translate(response) if detected_language == "Hindi" else response
-
-    # Emergency detection
-    EMERGENCY_KEYWORDS = [
-        'heart attack', 'chest pain', 'bleeding', 'unconscious',
-        'stroke', 'severe pain', 'emergency', 'सांस नहीं', 'दिल का दौरा'
-    ]
-    if any(word in original_input.lower() for word in EMERGENCY_KEYWORDS):
-        response = "🚨 **Emergency!** Please contact 112/108 or visit the nearest hospital immediately."
-        return translator_hi.translate(response) if detected_language == "Hindi" else response
-
-    # Step 1: Try Rasa entity extraction first
-    entities = get_rasa_entities(original_input)
+    with timed(timings, "language_detection"):
+        detected_language = detect_language(original_input)
+
+    # Emergencies, greetings, thanks and goodbyes (data/intent_rules.json) are answered
+    # in the language the user wrote in; emergencies never wait for Rasa or the translator
+    rule = get_intent_rules().match(original_input)
+    if rule is not None:
+        metadata["path"] = rule["reply"]
+        short_reply = get_localizer(detected_language)
+        if rule["intent"] == "emergency":
+            yield short_reply.cached_string(rule["reply"])
+        else:
+            yield short_reply.string(rule["reply"])
+        return
+
+    # Replies are assembled from the pre-translated knowledge base, no translation at request time
+    reply_language = "Hindi" if detected_language == "Hindi" and target_language == "Hindi" else "English"
+
+    # Step 1: Fast local symptom extraction
+    with timed(timings, "symptom_extraction"):
+        try:
+            entities = extract_symptoms(original_input)
+        except Exception as e:
+            logger.warning("Local symptom extraction error: %s", e)
+            entities = []
+
+    # Step 2: If the local extractor is unsure, ask Rasa. English messages build the keyword-match
+    # fallback at the same time; others need the translator for it, so only once Rasa has come back empty
+    fallback = None
+    metadata["path"] = "local"
+    if not entities or min(e['confidence_entity'] for e in entities) < SYMPTOM_CONFIDENCE_THRESHOLD:
+        if detected_language == "English":
+            fallback = get_executor().submit(_build_fallback, timings, original_input, reply_language)
+        with timed(timings, "rasa"):
+            rasa_entities = get_rasa_entities(original_input)
+        if rasa_entities:
+            entities = rasa_entities
+            metadata["path"] = "rasa"
+        else:
+            # No second opinion (Rasa down, circuit open or nothing found): only trust confident
+            # local matches, otherwise a typo guess like "fewer" -> "fever" beats the keyword fallback
+            entities = [e for e in entities if e['confidence_entity'] >= SYMPTOM_CONFIDENCE_THRESHOLD]
     symptoms = [e['value'] for e in entities if e['entity'] == 'symptom']
-    
+    metadata["entities"] = [{"entity": e['entity'], "value": e['value']} for e in entities]
+
     if symptoms:
-        print(f"DEBUG: Rasa extracted symptoms: {symptoms}")
-        final_response = process_detected_symptoms(symptoms, original_input)
+        logger.debug("symptoms path=%s symptoms=%s", metadata["path"], symptoms)
+        yield from iter_detected_symptom_sections(symptoms, original_input, reply_language, metadata["topics"])
     else:
-        print("DEBUG: No symptoms found by Rasa, using fallback")
-        final_response = process_with_knowledge_base(original_input)
-
-    # Translate if needed
-    if detected_language == "Hindi" and target_language == "Hindi":
-        try:
-            final_response = translator_hi.translate(final_response)
-        except:
-            pass
+        metadata["path"] = "fallback"
+        logger.debug("no_symptoms path=fallback")
+        if fallback is not None:
+            sections, topics = fallback.result()
+            metadata["topics"].extend(topics)
+            yield from sections
+        else:
+            yield from iter_knowledge_base_sections(original_input, reply_language, metadata["topics"],
+                                                    detected_language)
 
-    return final_response
\ No newline at end of file
+def _build_fallback(timings, original_input, language):
+    """(sections, matched topic names) of the keyword-match fallback reply to an English message"""
+    topics = []
+    with timed(timings, "kb_fallback"):
+        return list(iter_knowledge_base_sections(original_input, language, topics, "English")), topics
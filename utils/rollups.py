@@ -0,0 +1,85 @@
+from collections import Counter
+
+from utils.response_cache import normalize_input
+
+# Aggregates behind the admin usage statistics, kept up to date as rows are written
+CREATE_ROLLUP_TABLES = [
+    '''CREATE TABLE IF NOT EXISTS daily_query_counts (
+           date TEXT PRIMARY KEY,
+           count INTEGER NOT NULL DEFAULT 0
+       )''',
+    '''CREATE TABLE IF NOT EXISTS query_frequency (
+           normalized_query TEXT PRIMARY KEY,
+           frequency INTEGER NOT NULL DEFAULT 0
+       )''',
+    "CREATE INDEX IF NOT EXISTS idx_query_frequency ON query_frequency (frequency)",
+    '''CREATE TABLE IF NOT EXISTS demographics_counts (
+           age_group TEXT NOT NULL,
+           language TEXT NOT NULL,
+           count INTEGER NOT NULL DEFAULT 0,
+           PRIMARY KEY (age_group, language)
+       )''',
+    '''CREATE TABLE IF NOT EXISTS feedback_rating_counts (
+           rating TEXT PRIMARY KEY,
+           count INTEGER NOT NULL DEFAULT 0,
+           with_comments INTEGER NOT NULL DEFAULT 0
+       )''',
+]
+
+UPSERT_DAILY = '''INSERT INTO daily_query_counts (date, count) VALUES (?, ?)
+                  ON CONFLICT(date) DO UPDATE SET count = count + excluded.count'''
+UPSERT_QUERY = '''INSERT INTO query_frequency (normalized_query, frequency) VALUES (?, ?)
+                  ON CONFLICT(normalized_query) DO UPDATE SET frequency = frequency + excluded.frequency'''
+UPSERT_DEMOGRAPHICS = '''INSERT INTO demographics_counts (age_group, language, count) VALUES (?, ?, ?)
+                         ON CONFLICT(age_group, language) DO UPDATE SET count = count + excluded.count'''
+UPSERT_FEEDBACK = '''INSERT INTO feedback_rating_counts (rating, count, with_comments) VALUES (?, ?, ?)
+                     ON CONFLICT(rating) DO UPDATE SET count = count + excluded.count,
+                                                       with_comments = with_comments + excluded.with_comments'''
+
+
+def record_messages(conn, rows):
+    """Count user messages from (conversation_id, sender, text, feedback, timestamp) rows"""
+    daily = Counter()
+    queries = Counter()
+    for _, sender, text, _, timestamp in rows:
+        if sender != "user":
+            continue
+        daily[timestamp[:10]] += 1
+        queries[normalize_input(text or "")] += 1
+    if daily:
+        conn.executemany(UPSERT_DAILY, daily.items())
+        conn.executemany(UPSERT_QUERY, queries.items())
+
+
+def record_feedback(conn, rows):
+    """Count feedback from (user_id, query, bot_response, rating, comment, timestamp) rows"""
+    counts = Counter()
+    comments = Counter()
+    for _, _, _, rating, comment, _ in rows:
+        counts[rating] += 1
+        comments[rating] += 1 if comment else 0
+    if counts:
+        conn.executemany(UPSERT_FEEDBACK, [(rating, n, comments[rating]) for rating, n in counts.items()])
+
+
+def record_user(conn, age_group, language):
+    conn.execute(UPSERT_DEMOGRAPHICS, (age_group or "", language or "", 1))
+
+
+def rebuild_rollups(conn):
+    """Recompute every rollup table from the raw tables (backfill or repair)"""
+    conn.create_function("normalize_query", 1, lambda text: normalize_input(text or ""))
+    for table in ("daily_query_counts", "query_frequency", "demographics_counts", "feedback_rating_counts"):
+        conn.execute(f"DELETE FROM {table}")
+    conn.execute('''INSERT INTO daily_query_counts (date, count)
+                    SELECT DATE(timestamp), COUNT(*) FROM messages
+                    WHERE sender = 'user' GROUP BY DATE(timestamp)''')
+    conn.execute('''INSERT INTO query_frequency (normalized_query, frequency)
+                    SELECT normalize_query(message_content), COUNT(*) FROM messages
+                    WHERE sender = 'user' GROUP BY normalize_query(message_content)''')
+    conn.execute('''INSERT INTO demographics_counts (age_group, language, count)
+                    SELECT IFNULL(age_group, ''), IFNULL(language, ''), COUNT(*) FROM users
+                    GROUP BY IFNULL(age_group, ''), IFNULL(language, '')''')
+    conn.execute('''INSERT INTO feedback_rating_counts (rating, count, with_comments)
+                    SELECT rating, COUNT(*), COUNT(CASE WHEN comment != '' THEN 1 END) FROM feedback
+                    GROUP BY rating''')
@@ -0,0 +1,139 @@
+import re
+import threading
+
+from utils.kb_index import get_kb_index
+from utils.keyword_matcher import KeywordAutomaton
+
+NLU_DATA_PATHS = ["y/data/nlu.yml"]
+
+# Local matches at or above this confidence are used without asking Rasa
+CONFIDENCE_THRESHOLD = 0.85
+
+_ANNOTATION = re.compile(r"\[([^\]]+)\]\(symptom\)")
+_TOKEN = re.compile(r"\w+")
+
+
+def annotated_symptoms(path):
+    """Symptom strings annotated as [text](symptom) in a Rasa NLU/test file"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {m.group(1).lower() for m in _ANNOTATION.finditer(f.read())}
+    except FileNotFoundError:
+        return set()
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or limit + 1 once it is known to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SymptomExtractor:
+    """
+    Zero-dependency symptom entity extractor:
+    - Gazetteer of KB topic names/keywords plus the [..](symptom) annotations in the NLU data
+    - Exact phrases found with one automaton scan (confidence 1.0)
+    - Remaining words matched to single-word entries by edit distance (lower confidence)
+    Entities come back in the same shape as Rasa's.
+    """
+
+    def __init__(self, phrases):
+        self.automaton = KeywordAutomaton()
+        self.single_words = {}      # (first letter, length) -> [word]
+        self._fuzzy_cache = {}      # token -> (word, confidence) or None
+        for phrase in phrases:
+            phrase = phrase.strip().lower()
+            if not phrase:
+                continue
+            self.automaton.add(phrase, phrase)
+            if " " not in phrase and len(phrase) >= 5:
+                self.single_words.setdefault((phrase[0], len(phrase)), []).append(phrase)
+        self.automaton.build()
+
+    def _fuzzy(self, token):
+        """Best single-word gazetteer entry within the allowed typo distance (memoized per token)"""
+        if token in self._fuzzy_cache:
+            return self._fuzzy_cache[token]
+        best, best_distance = None, None
+        for length in range(len(token) - 2, len(token) + 3):
+            for word in self.single_words.get((token[0], length), []):
+                limit = 1 if len(word) < 8 else 2
+                distance = edit_distance(token, word, limit)
+                if distance <= limit and (best_distance is None or distance < best_distance):
+                    best, best_distance = word, distance
+        result = None if best is None else (best, 1.0 - best_distance / len(best))
+        if len(self._fuzzy_cache) < 50000:
+            self._fuzzy_cache[token] = result
+        return result
+
+    def extract(self, text):
+        text = text.lower()
+        entities = []
+        covered = [False] * len(text)
+
+        # Exact phrases, longest first so "lower back pain" wins over "back pain"
+        matches = sorted(self.automaton.iter_matches(text), key=lambda m: (m[0] - m[1], m[0]))
+        for start, end, phrase in matches:
+            if any(covered[start:end]):
+                continue
+            covered[start:end] = [True] * (end - start)
+            entities.append(self._entity(phrase, start, end, 1.0))
+
+        # Typos in words the gazetteer did not cover
+        for token in _TOKEN.finditer(text):
+            word = token.group()
+            if len(word) < 5 or any(covered[token.start():token.end()]):
+                continue
+            match = self._fuzzy(word)
+            if match:
+                entities.append(self._entity(match[0], token.start(), token.end(), round(match[1], 3)))
+
+        return sorted(entities, key=lambda e: e["start"])
+
+    @staticmethod
+    def _entity(value, start, end, confidence):
+        return {
+            "entity": "symptom",
+            "value": value,
+            "start": start,
+            "end": end,
+            "confidence_entity": confidence,
+            "extractor": "SymptomExtractor",
+        }
+
+
+_extractor = None
+_extractor_version = None
+_lock = threading.Lock()
+
+
+def get_symptom_extractor():
+    """Shared extractor, rebuilt when the knowledge base index changes"""
+    global _extractor, _extractor_version
+    snapshot = get_kb_index().snapshot
+    if _extractor is None or _extractor_version != snapshot.version:
+        with _lock:
+            if _extractor is None or _extractor_version != snapshot.version:
+                phrases = set()
+                for topic, data in snapshot.topics.items():
+                    phrases.add(topic)
+                    phrases.update(data.get("keywords", []))
+                for path in NLU_DATA_PATHS:
+                    phrases.update(annotated_symptoms(path))
+                _extractor = SymptomExtractor(phrases)
+                _extractor_version = snapshot.version
+    return _extractor
+
+
+def extract_symptoms(text):
+    """Symptom entities found locally, in Rasa's entity format"""
+    return get_symptom_extractor().extract(text)
@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+
+from utils.db import get_connection, transaction
+from utils.metrics import get_metrics
+
+TRANSLATION_DB_PATH = "database/translations.db"
+
+
+def google_backend():
+    """Default backend: deep_translator's GoogleTranslator, one instance per target language"""
+    from deep_translator import GoogleTranslator
+
+    translators = {}
+
+    def translate(text, target):
+        if target not in translators:
+            translators[target] = GoogleTranslator(source='auto', target=target)
+        return translators[target].translate(text)
+
+    return translate
+
+
+class TranslationCache:
+    """
+    Two-tier cache in front of the translator, keyed by (source text, target language):
+    - An in-process LRU for the hot strings (disclaimer, greeting, KB paragraphs)
+    - A SQLite table so translations survive restarts
+    The backend is any callable (text, target) -> str, so tests can plug in a local stub.
+    """
+
+    def __init__(self, backend=None, max_entries=2048, db_path=TRANSLATION_DB_PATH):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def set_backend(self, backend):
+        self.backend = backend
+
+    def _connection(self):
+        conn = get_connection(self.db_path)
+        if not self._table_ready:
+            conn.execute('''CREATE TABLE IF NOT EXISTS translations (
+                                source_text TEXT,
+                                target TEXT,
+                                translated TEXT,
+                                PRIMARY KEY (source_text, target)
+                            )''')
+            conn.commit()
+            self._table_ready = True
+        return conn
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def cached(self, text, target):
+        """Translation from the memory or disk tier, without calling the backend; None if not cached"""
+        key = (text, target)
+
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._lru[key]
+
+        row = self._connection().execute(
+            "SELECT translated FROM translations WHERE source_text = ? AND target = ?", key
+        ).fetchone()
+        if row:
+            self.stats["disk_hits"] += 1
+            self._remember(key, row[0])
+            return row[0]
+        return None
+
+    def translate(self, text, target):
+        if not text or not text.strip():
+            return text
+        translated = self.cached(text, target)
+        if translated is not None:
+            return translated
+
+        key = (text, target)
+        self.stats["misses"] += 1
+        if self.backend is None:
+            self.backend = google_backend()
+        with get_metrics().timer("translation.backend"):
+            translated = self.backend(text, target)
+        if translated:
+            with transaction(self.db_path) as conn:
+                conn.execute("INSERT OR REPLACE INTO translations (source_text, target, translated) VALUES (?, ?, ?)",
+                             (text, target, translated))
+            self._remember(key, translated)
+        return translated
+
+    def hit_rate(self):
+        total = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        return (self.stats["memory_hits"] + self.stats["disk_hits"]) / total if total else 0.0
+
+    def clear_memory(self):
+        with self._lock:
+            self._lru.clear()
+
+
+_cache = TranslationCache()
+
+
+def get_translation_cache():
+    return _cache
+
+
+def translate(text, target):
+    """Translate text to the target language code ('hi', 'en', ...) through the shared cache"""
+    return _cache.translate(text, target)
@@ -0,0 +1,19 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads for overlapping the I/O-bound steps of a chat turn (Rasa, translation, DB writes)
+CHAT_WORKERS = int(os.environ.get("WELLBOT_CHAT_WORKERS", "8"))
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide thread pool shared by every chat session"""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=CHAT_WORKERS, thread_name_prefix="chat-worker")
+    return _executor